@@ -0,0 +1,266 @@
+""" Heap benchmarks
+
+   python benchmark.py compare [--sizes 1000 10000 ...] [--inputs random sorted reversed]
+                               [--repeat N] [--seed N] [--output results.json]
+     Times push, pop, build and mixed workloads for every heap implementation in the repo
+     (heap.py, heap_np.py, graph/heap.py) and for the standard library's heapq, on random,
+     sorted and reversed (adversarial: every push sifts up to the root of a min heap) inputs.
+     The results are written as JSON (to stdout, or to --output), together with the Python and
+     NumPy versions and the git commit, so runs can be compared from release to release. Sizes
+     from 1e3 to 1e7 are supported; the defaults are kept small enough to finish in minutes.
+
+   python benchmark.py arity [size]
+     Times push-heavy, pop-heavy and mixed workloads for binary, 4-ary and 8-ary heaps, using
+     BinaryHeap (heap.py, native ordering) and NumericBinaryHeap (heap_np.py).
+
+     A higher arity makes the heap shallower, so add() (sift up) visits fewer levels, while pop()
+     (sift down) compares more children per level. Which arity is fastest depends on the heap, the
+     workload and the machine, and the results are not consistent from run to run: on one machine,
+     push_heavy at size 20000 was fastest at 8 for BinaryHeap, while for NumericBinaryHeap it was
+     fastest at 4, with 8 slower than 2. Run this benchmark on the target machine before choosing.
+"""
+
+import argparse
+import heapq
+import importlib.util
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import heap_np
+from heap import BinaryHeap
+from heap_np import NumericBinaryHeap
+from item import Item
+
+# graph/heap.py has the same module name as heap.py, so it is loaded from its path under another name
+GRAPH_HEAP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "graph", "heap.py")
+graph_heap_spec = importlib.util.spec_from_file_location("graph_heap", GRAPH_HEAP_PATH)
+graph_heap = importlib.util.module_from_spec(graph_heap_spec)
+graph_heap_spec.loader.exec_module(graph_heap)
+
+"""
+COMPARISON OF IMPLEMENTATIONS
+"""
+
+class Implementation:
+    """ Adapts one heap implementation to the benchmark: prepare() converts a list of floats into the
+    elements the heap holds, new() creates an empty heap, and build() makes a heap from prepared elements. """
+
+    def __init__(self, name, prepare, new, push, pop, build):
+        self.name = name
+        self.prepare = prepare
+        self.new = new
+        self.push = push
+        self.pop = pop
+        self.build = build
+
+def object_array(values):
+    array = np.empty(len(values), dtype='object')
+    array[:] = values
+    return array
+
+def build_heap(heap, array):
+    heap.build(array)
+    return heap
+
+def build_heapq(elements):
+    heapq.heapify(elements)
+    return elements
+
+IMPLEMENTATIONS = [
+    Implementation("heapq", list, list, heapq.heappush, heapq.heappop, build_heapq),
+    Implementation("heap.BinaryHeap(compare)",
+                   lambda values: [Item(value) for value in values],
+                   lambda: BinaryHeap(BinaryHeap.MIN_HEAP),
+                   BinaryHeap.add, BinaryHeap.pop,
+                   lambda elements: build_heap(BinaryHeap(BinaryHeap.MIN_HEAP), elements)),
+    Implementation("heap.BinaryHeap(native)", list,
+                   lambda: BinaryHeap(BinaryHeap.MIN_HEAP, native=True),
+                   BinaryHeap.add, BinaryHeap.pop,
+                   lambda elements: build_heap(BinaryHeap(BinaryHeap.MIN_HEAP, native=True), elements)),
+    Implementation("heap_np.BinaryHeap(native)", list,
+                   lambda: heap_np.BinaryHeap(heap_np.BinaryHeap.MIN_HEAP, native=True),
+                   heap_np.BinaryHeap.add, heap_np.BinaryHeap.pop,
+                   lambda elements: build_heap(heap_np.BinaryHeap(heap_np.BinaryHeap.MIN_HEAP, native=True), object_array(elements))),
+    Implementation("heap_np.NumericBinaryHeap", list,
+                   lambda: NumericBinaryHeap(NumericBinaryHeap.MIN_HEAP),
+                   NumericBinaryHeap.add, NumericBinaryHeap.pop,
+                   lambda elements: build_heap(NumericBinaryHeap(NumericBinaryHeap.MIN_HEAP), np.array(elements))),
+    Implementation("graph/heap.BinaryHeap(compare)",
+                   lambda values: [Item(value) for value in values],
+                   lambda: graph_heap.BinaryHeap(graph_heap.BinaryHeap.MIN_HEAP),
+                   graph_heap.BinaryHeap.add, graph_heap.BinaryHeap.pop,
+                   lambda elements: build_heap(graph_heap.BinaryHeap(graph_heap.BinaryHeap.MIN_HEAP), elements)),
+]
+
+INPUTS = {
+    "random" : lambda size, rng: [rng.random() for i in range(size)],
+    "sorted" : lambda size, rng: [float(i) for i in range(size)],
+    "reversed" : lambda size, rng: [float(size - i) for i in range(size)],
+}
+
+# Each workload runs on a list of prepared elements and returns the seconds taken by its timed part
+def push_workload(implementation, elements):
+    heap = implementation.new()
+    push = implementation.push
+
+    start = time.perf_counter()
+    for element in elements:
+        push(heap, element)
+    return time.perf_counter() - start
+
+def pop_workload(implementation, elements):
+    heap = implementation.build(list(elements))
+    pop = implementation.pop
+
+    start = time.perf_counter()
+    for i in range(len(elements)):
+        pop(heap)
+    return time.perf_counter() - start
+
+def build_workload(implementation, elements):
+    elements = list(elements)
+
+    start = time.perf_counter()
+    implementation.build(elements)
+    return time.perf_counter() - start
+
+def mixed_workload(implementation, elements):
+    heap = implementation.new()
+    push = implementation.push
+    pop = implementation.pop
+
+    start = time.perf_counter()
+    for count in range(len(elements)):
+        push(heap, elements[count])
+        if count % 2 == 1:
+            pop(heap)
+    return time.perf_counter() - start
+
+COMPARE_WORKLOADS = {
+    "push" : push_workload,
+    "pop" : pop_workload,
+    "build" : build_workload,
+    "mixed" : mixed_workload,
+}
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def run_compare(sizes, inputs, repeat, seed):
+    results = []
+
+    for size in sizes:
+        for input_name in inputs:
+            values = INPUTS[input_name](size, random.Random(seed))
+
+            for implementation in IMPLEMENTATIONS:
+                elements = implementation.prepare(values)
+
+                for workload_name, workload in COMPARE_WORKLOADS.items():
+
+                    # The fastest of the repeats is the least disturbed by other activity on the machine
+                    seconds = min(workload(implementation, elements) for i in range(repeat))
+                    results.append({"implementation" : implementation.name, "workload" : workload_name,
+                                    "input" : input_name, "size" : size, "seconds" : seconds,
+                                    "ops_per_second" : size / seconds if seconds > 0 else None})
+
+                    print("%-32s %-6s %-9s %9d %10.4fs" % (implementation.name, workload_name, input_name, size, seconds),
+                          file=sys.stderr)
+
+    return {"metadata" : {"python" : platform.python_version(), "numpy" : np.__version__,
+                          "platform" : platform.platform(), "commit" : git_commit(),
+                          "repeat" : repeat, "seed" : seed, "time" : time.time()},
+            "results" : results}
+
+"""
+COMPARISON OF ARITIES
+"""
+
+ARITIES = [2, 4, 8]
+
+def push_heavy(heap, values):
+    """ Adds every value, popping one element for every eight added. """
+    for count, value in enumerate(values):
+        heap.add(value)
+        if count % 8 == 7:
+            heap.pop()
+
+def pop_heavy(heap, values):
+    """ Adds every value, then pops every element. """
+    for value in values:
+        heap.add(value)
+    while not heap.is_empty():
+        heap.pop()
+
+def mixed(heap, values):
+    """ Alternates between adding two values and popping one element. """
+    for count, value in enumerate(values):
+        heap.add(value)
+        if count % 2 == 1:
+            heap.pop()
+
+ARITY_WORKLOADS = [push_heavy, pop_heavy, mixed]
+
+def time_workload(make_heap, workload, values):
+    heap = make_heap()
+    start = time.perf_counter()
+    workload(heap, values)
+    return time.perf_counter() - start
+
+def run_arity(size):
+    values = [random.random() for i in range(size)]
+
+    heaps = [("BinaryHeap", lambda arity: BinaryHeap(BinaryHeap.MIN_HEAP, native=True, arity=arity)),
+             ("NumericBinaryHeap", lambda arity: NumericBinaryHeap(NumericBinaryHeap.MIN_HEAP, arity=arity))]
+
+    print("%-18s %-11s %s" % ("heap", "workload", "  ".join("arity=%-4d" % arity for arity in ARITIES)))
+    for name, make_heap in heaps:
+        for workload in ARITY_WORKLOADS:
+            timings = []
+            for arity in ARITIES:
+                timings.append(time_workload(lambda: make_heap(arity), workload, values))
+
+            best = ARITIES[timings.index(min(timings))]
+            print("%-18s %-11s %s   best: %d" % (name, workload.__name__,
+                  "  ".join("%9.3fs" % timing for timing in timings), best))
+
+def main():
+    parser = argparse.ArgumentParser(description="Heap benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compare = commands.add_parser("compare", help="compare the heap implementations and heapq")
+    compare.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    compare.add_argument("--inputs", nargs="+", choices=list(INPUTS.keys()), default=list(INPUTS.keys()))
+    compare.add_argument("--repeat", type=int, default=3)
+    compare.add_argument("--seed", type=int, default=0)
+    compare.add_argument("--output", help="file for the JSON results (default: stdout)")
+
+    arity = commands.add_parser("arity", help="compare heap arities")
+    arity.add_argument("size", type=int, nargs="?", default=100000)
+
+    arguments = parser.parse_args()
+
+    if arguments.command == "arity":
+        run_arity(arguments.size)
+    else:
+        report = run_compare(arguments.sizes, arguments.inputs, arguments.repeat, arguments.seed)
+        if arguments.output is None:
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(arguments.output, "w") as file:
+                json.dump(report, file, indent=2)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,142 @@
+""" Implementation of a binomial heap
+   A mergeable heap with the same add()/pop()/is_empty() surface as BinaryHeap in heap.py, and
+   the same ordering modes (compare(), native=True or a cached key=function).
+
+   The heap is a list of binomial trees with distinct orders, where trees[order] is a tree of
+   2^order elements (or None). Like adding binary numbers, two trees of the same order are
+   linked into one tree of the next order.
+     add(): O(1) amortized, O(log n) worst case
+     meld(): O(log n)
+     pop(): O(log n) - the children of the removed root are melded back into the heap
+"""
+
+from heap import BinaryHeap, priority_function
+
+class BinomialNode:
+
+    def __init__(self, value, priority):
+        self.value = value
+        self.priority = priority
+
+        # children[order] is the child tree of that order
+        self.children = []
+
+    def get_value(self):
+        return self.value
+
+class BinomialHeap:
+
+    MIN_HEAP = BinaryHeap.MIN_HEAP
+    MAX_HEAP = BinaryHeap.MAX_HEAP
+
+    def __init__(self, heap_type, key=None, native=False):
+        self.trees = []
+        self.num_elements = 0
+        self.heap_type = heap_type
+        self.key = key
+
+        # higher(x, y) is True if priority x belongs above priority y
+        self.higher = priority_function(heap_type, native or key is not None)
+
+    def get_length(self):
+        return self.num_elements
+
+    def is_empty(self):
+        if self.num_elements == 0:
+            return True
+        else:
+            return False
+
+    # Returns the top element without removing it, or None if the heap is empty
+    def peek(self):
+        order = self.top_order()
+        if order is None:
+            return None
+        else:
+            return self.trees[order].value
+
+    def add(self, value):
+        tree = BinomialNode(value, value if self.key is None else self.key(value))
+
+        # Carry the new tree up through the orders which are already taken
+        order = 0
+        while order < len(self.trees) and self.trees[order] is not None:
+            tree = self.link(self.trees[order], tree)
+            self.trees[order] = None
+            order = order + 1
+
+        if order == len(self.trees):
+            self.trees.append(tree)
+        else:
+            self.trees[order] = tree
+
+        self.num_elements = self.num_elements + 1
+
+    def pop(self):
+        order = self.top_order()
+        if order is None:
+            return None
+
+        root = self.trees[order]
+        self.trees[order] = None
+        while len(self.trees) > 0 and self.trees[-1] is None:
+            self.trees.pop()
+
+        # The root's children are a complete list of trees of orders 0 to order - 1
+        self.meld_trees(root.children)
+        self.num_elements = self.num_elements - 1
+
+        return root.value
+
+    def meld(self, other):
+        """ Moves every element of 'other', a binomial heap of the same type and ordering, into this heap in O(log n). """
+
+        self.meld_trees(other.trees)
+        self.num_elements = self.num_elements + other.num_elements
+
+        other.trees = []
+        other.num_elements = 0
+
+    # Adds a list of trees (indexed by order) to the heap's trees, carrying as in binary addition
+    def meld_trees(self, trees):
+        carry = None
+        order = 0
+
+        while order < len(trees) or carry is not None:
+            if order == len(self.trees):
+                self.trees.append(None)
+
+            same_order = [tree for tree in (self.trees[order], trees[order] if order < len(trees) else None, carry)
+                          if tree is not None]
+
+            if len(same_order) == 0:
+                self.trees[order] = None
+                carry = None
+            elif len(same_order) == 1:
+                self.trees[order] = same_order[0]
+                carry = None
+            elif len(same_order) == 2:
+                self.trees[order] = None
+                carry = self.link(same_order[0], same_order[1])
+            else:
+                self.trees[order] = same_order[2]
+                carry = self.link(same_order[0], same_order[1])
+
+            order = order + 1
+
+    # Order of the tree whose root has the highest priority, or None if the heap is empty
+    def top_order(self):
+        top = None
+        for order in range(len(self.trees)):
+            tree = self.trees[order]
+            if tree is not None and (top is None or self.higher(tree.priority, self.trees[top].priority)):
+                top = order
+        return top
+
+    # Links two trees of the same order, making the root with the lower priority a child of the other
+    def link(self, first, second):
+        if self.higher(second.priority, first.priority):
+            first, second = second, first
+
+        first.children.append(second)
+        return first
\ No newline at end of file
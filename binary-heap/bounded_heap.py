@@ -0,0 +1,69 @@
+""" Implementation of a bounded heap, for selecting the top K elements of a stream
+   The heap keeps at most 'capacity' elements. Once it is full, every added element either
+   evicts the worst kept element or is rejected, so memory stays O(K) however many elements are
+   added.
+
+   To keep the biggest elements (largest=True), the kept elements are held in a min heap, so the
+   first one to be evicted is on top and each add costs a single pushpop(). Elements are ordered
+   as in heap.py: with compare() (eg. Item objects), natively (native=True, eg. plain numbers) or
+   by a cached key (key=function).
+"""
+
+from heap import BinaryHeap
+
+class BoundedHeap:
+
+    def __init__(self, capacity, largest=True, key=None, native=False):
+        self.capacity = capacity
+
+        if largest:
+            self.heap = BinaryHeap(BinaryHeap.MIN_HEAP, key, native)
+        else:
+            self.heap = BinaryHeap(BinaryHeap.MAX_HEAP, key, native)
+
+    def get_length(self):
+        return len(self.heap.get_array())
+
+    def is_empty(self):
+        return self.heap.is_empty()
+
+    def is_full(self):
+        if len(self.heap.get_array()) >= self.capacity:
+            return True
+        else:
+            return False
+
+    # The worst kept element (the next one to be evicted), or None if the heap is empty
+    def peek(self):
+        return self.heap.peek()
+
+    def add(self, value):
+        """ Adds a value. If the heap was full, returns the element which no longer fits (the evicted
+        element, or 'value' itself if it is not better than any kept element), otherwise None. """
+
+        if len(self.heap.get_array()) < self.capacity:
+            self.heap.add(value)
+            return None
+        elif self.capacity == 0:
+            return value
+        else:
+            return self.heap.pushpop(value)
+
+    # Adds every value of an iterable, consuming it lazily
+    def consume(self, values):
+        for value in values:
+            self.add(value)
+
+    def pop_all(self):
+        """ Removes and returns the kept elements, best first. """
+
+        values = self.heap.pop_many(len(self.heap.get_array()))
+        values.reverse()
+        return values
+
+def top_k(values, k, largest=True, key=None, native=False):
+    """ Returns the 'k' best elements of an iterable, best first, holding at most 'k' of them at a time. """
+
+    bounded_heap = BoundedHeap(k, largest, key, native)
+    bounded_heap.consume(values)
+    return bounded_heap.pop_all()
\ No newline at end of file
@@ -1,6 +1,6 @@
 """ Implementation of a binary heap
    This class implements a binary heap with object elements
-   
+
    The elements must implement a Compares interface, which uses
    a compare() method for element comparision, where:
      1: Object calling the method is bigger than the one used as an argument
@@ -8,20 +8,84 @@
      -1: Object calling the method is less than the one used as an argument
 
    Ex) object1.compare(object2)
+
+   Alternatively, the heap can order its elements without compare():
+     native=True: elements are compared directly with the '<' / '>' operators
+     key=function: key(element) is computed once when the element is inserted, cached
+       alongside the element, and the cached keys are compared with '<' / '>'
+
+   In every mode, the min/max decision is made once at construction.
+
+   The heap is binary by default, but any arity (number of children per node) can be used, eg.
+   a 4-ary or 8-ary heap is shallower, making add() cheaper and pop() somewhat more expensive.
+
+   heapsort() and partial_sort() sort a list in place with the heap's sift_down().
 """
 
+import operator
+from heap_stats import HeapStats, instrument, uninstrument
+
+def priority_function(heap_type, native):
+    """ Returns a function higher(x, y) which is True when x must be placed above y in a heap
+    of type 'heap_type'. If 'native' is False, x and y are compared with their compare() method. """
+
+    if native:
+        if heap_type == BinaryHeap.MAX_HEAP:
+            return operator.gt
+        else:
+            return operator.lt
+    else:
+        if heap_type == BinaryHeap.MAX_HEAP:
+            return lambda x, y: x.compare(y) == 1
+        else:
+            return lambda x, y: x.compare(y) == -1
+
 class BinaryHeap:
 
     MIN_HEAP = 0
     MAX_HEAP = 1
 
-    def __init__(self, heap_type):
+    def __init__(self, heap_type, key=None, native=False, arity=2):
         self.array = []
         self.heap_type = heap_type
+        self.arity = arity
+
+        # Cached keys, parallel to 'array' (None if no key function is used)
+        self.key = key
+        self.keys = None if key is None else []
+
+        # higher(x, y) is True if priority x belongs above priority y
+        self.higher = priority_function(heap_type, native or key is not None)
+
+        # Counters, while instrumentation is enabled (see enable_stats())
+        self.stats = None
 
     def get_array(self):
         return self.array
 
+    def enable_stats(self, hook=None):
+        """ Starts counting comparisons, swaps, sift path lengths and resizes (see heap_stats.py),
+        and returns the HeapStats object holding the counts. """
+
+        if self.stats is not None:
+            self.disable_stats()
+
+        self.stats = HeapStats()
+        instrument(self, self.stats, hook)
+        return self.stats
+
+    def disable_stats(self):
+        if self.stats is not None:
+            uninstrument(self)
+            self.stats = None
+
+    # The value used for ordering the element at 'index' (its cached key, or the element itself)
+    def get_priority(self, index):
+        if self.keys is None:
+            return self.array[index]
+        else:
+            return self.keys[index]
+
     # Determines the existence of a left child
     def left_child_exist(self, index):
         if (self.left_child(index) > len(self.array) - 1):
@@ -38,13 +102,15 @@ class BinaryHeap:
 
     # Determines index of parent index - valid index is determined in calling code
     def parent(self, index):
-        return (index - 1) // 2
+        return (index - 1) // self.arity
 
+    # First child of a node
     def left_child(self, index):
-        return (2 * index + 1)
+        return (self.arity * index + 1)
 
+    # Last child of a node (the right child of a binary heap)
     def right_child(self, index):
-        return (2 * index + 2)
+        return (self.arity * index + self.arity)
 
     def is_empty(self):
         if len(self.array) == 0:
@@ -52,14 +118,18 @@ class BinaryHeap:
         else:
             return False
 
-    def heapify (self):
-        if len(self.array) == 0:
+    # Organizes the first 'length' elements of the array (by default, all of them) into a heap
+    def heapify (self, length=None):
+        if length is None:
+            length = len(self.array)
+        if length == 0:
             return
 
-        index = len(self.array) - 1
+        # Leaves are already heaps, so start from the parent of the last element
+        index = self.parent(length - 1)
 
         while(index >= 0):
-            self.sift_down(index)
+            self.sift_down(index, length)
             index = index - 1
 
     # This method builds the heap from an array by iterating from the last element of the array to
@@ -69,86 +139,190 @@ class BinaryHeap:
             return
 
         self.array = array
+        if self.keys is not None:
+            self.keys = [self.key(value) for value in array]
         self.heapify()
 
     def add(self, value):
         index = len(self.array)
         self.array.append(value)
+        if self.keys is not None:
+            self.keys.append(self.key(value))
         self.sift_up(index)
 
     def pop(self):
         value = None
         if len(self.array) > 0:
             value = self.array[0]
-            if len(self.array) > 1:
-                self.array[0] = self.array.pop()
+            last = self.array.pop()
+            if self.keys is not None:
+                last_key = self.keys.pop()
+            if len(self.array) > 0:
+                self.array[0] = last
+                if self.keys is not None:
+                    self.keys[0] = last_key
                 self.sift_down(0)
-            else:
-                self.array.pop()
         return value
 
+    # Returns the top element without removing it, or None if the heap is empty
+    def peek(self):
+        if len(self.array) == 0:
+            return None
+        else:
+            return self.array[0]
+
+    def pushpop(self, value):
+        """ Adds a value, then pops and returns the top element. Faster than add() followed by pop(),
+        since at most one sift down is needed (and none if 'value' itself would be the top). """
+
+        priority = value if self.keys is None else self.key(value)
+        if len(self.array) == 0 or not self.higher(self.get_priority(0), priority):
+            return value
+
+        top = self.array[0]
+        self.array[0] = value
+        if self.keys is not None:
+            self.keys[0] = priority
+        self.sift_down(0)
+
+        return top
+
+    def replace(self, value):
+        """ Pops and returns the top element (None if the heap is empty), then adds a value, with a
+        single sift down. Unlike pushpop(), the returned element is never 'value' itself. """
+
+        if len(self.array) == 0:
+            self.add(value)
+            return None
+
+        top = self.array[0]
+        self.array[0] = value
+        if self.keys is not None:
+            self.keys[0] = self.key(value)
+        self.sift_down(0)
+
+        return top
+
+    def push_many(self, values):
+        """ Adds every value of an iterable. Each new element is sifted up, unless the batch is at
+        least as big as the heap, in which case the whole array is heapified instead. """
+
+        values = list(values)
+        if len(values) == 0:
+            return
+
+        start = len(self.array)
+        self.array.extend(values)
+        if self.keys is not None:
+            self.keys.extend([self.key(value) for value in values])
+
+        if len(values) >= start:
+            self.heapify()
+        else:
+            for index in range(start, len(self.array)):
+                self.sift_up(index)
+
+    def pop_many(self, k):
+        """ Removes and returns the top 'k' elements (fewer if the heap is smaller), in heap order. """
+
+        # Emptying a natively ordered heap is a sort of the remaining elements
+        if k >= len(self.array) and self.higher in (operator.lt, operator.gt):
+            reverse = self.higher is operator.gt
+            if self.keys is None:
+                values = sorted(self.array, reverse=reverse)
+            else:
+                order = sorted(range(len(self.array)), key=self.keys.__getitem__, reverse=reverse)
+                values = [self.array[index] for index in order]
+                del self.keys[:]
+            del self.array[:]
+            return values
+
+        values = []
+        while len(values) < k and len(self.array) > 0:
+            values.append(self.pop())
+        return values
+
     def swap_elements(self, x, y):
-        temp = self.array[x]
-        self.array[x] = self.array[y]
-        self.array[y] = temp
+        array = self.array
+        array[x], array[y] = array[y], array[x]
+        if self.keys is not None:
+            keys = self.keys
+            keys[x], keys[y] = keys[y], keys[x]
 
     def sift_up(self, index):
-        complete = False
-
-        while (index > 0 and complete == False):
-            parent_index = self.parent(index)
-            if(self.heap_type == BinaryHeap.MAX_HEAP):
-                if(self.array[index].compare(self.array[parent_index]) == 1):
-                    self.swap_elements(index, parent_index)
-                    index = parent_index
-                else:
-                    complete = True
-            elif(self.heap_type == BinaryHeap.MIN_HEAP):
-                if(self.array[index].compare(self.array[parent_index]) == -1):
-                    self.swap_elements(index, parent_index)
-                    index = parent_index
-                else:
-                    complete = True
-
-    def sift_down(self, index):
-        complete = False
-        z_index = -1
-        while(index < len(self.array) and complete == False):
-
-            # existence of children
-            if(self.left_child_exist(index)):
-                if(self.right_child_exist(index)):
-                
-                    # determine smaller/bigger value by heap type
-                    if(self.heap_type == BinaryHeap.MAX_HEAP):
-                        if(self.array[self.left_child(index)].compare( self.array[self.right_child(index)]) == 1):
-                            z_index = self.left_child(index)
-                        else:
-                            z_index = self.right_child(index)
-                    elif(self.heap_type == BinaryHeap.MIN_HEAP):
-                        if(self.array[self.left_child(index)].compare(self.array[self.right_child(index)]) == -1):
-                            z_index = self.left_child(index)
-                        else:
-                            z_index = self.right_child(index)
-
-                # only left child exist, use this value to compare with parent
-                else:
-                    z_index = self.left_child(index)
-
-                # Swap if necessary, depending on heap type
-                if(self.heap_type == BinaryHeap.MAX_HEAP):
-                    if(self.array[z_index].compare(self.array[index]) == 1):
-                        self.swap_elements(z_index, index)
-                        index = z_index
-                    else:
-                        complete = True
-                if(self.heap_type == BinaryHeap.MIN_HEAP):
-                    if(self.array[z_index].compare(self.array[index]) == -1):
-                        self.swap_elements(z_index, index)
-                        index = z_index
-                    else:
-                        complete = True
+        higher = self.higher
+        arity = self.arity
+        priorities = self.array if self.keys is None else self.keys
+
+        while index > 0:
+            parent_index = (index - 1) // arity
+            if higher(priorities[index], priorities[parent_index]):
+                self.swap_elements(index, parent_index)
+                index = parent_index
+            else:
+                break
+
+    # Sifts down within the first 'length' elements of the array (by default, all of them)
+    def sift_down(self, index, length=None):
+        higher = self.higher
+        arity = self.arity
+        priorities = self.array if self.keys is None else self.keys
+        if length is None:
+            length = len(priorities)
+
+        while True:
+            z_index = arity * index + 1
 
             # No child exists, therefore exit loop
+            if z_index >= length:
+                break
+
+            # Find the child with the highest priority
+            for child in range(z_index + 1, min(z_index + arity, length)):
+                if higher(priorities[child], priorities[z_index]):
+                    z_index = child
+
+            # Swap if the child belongs above its parent
+            if higher(priorities[z_index], priorities[index]):
+                self.swap_elements(z_index, index)
+                index = z_index
             else:
-                complete = True
\ No newline at end of file
+                break
+
+def heapsort(array, reverse=False, key=None, native=False):
+    """ Sorts a list in place, in ascending order (descending if 'reverse' is True). Elements are
+    ordered as in BinaryHeap; no memory is allocated unless a key function is used. """
+
+    partial_sort(array, len(array), reverse, key, native)
+
+def partial_sort(array, k, reverse=False, key=None, native=False):
+    """ Moves the 'k' smallest elements of a list (the 'k' biggest if 'reverse' is True) to its front,
+    in sorted order, in place. The order of the remaining elements is unspecified. """
+
+    k = min(k, len(array))
+    if k <= 0:
+        return
+
+    # The front of the array is a max heap of the k smallest elements seen so far (a min heap of
+    # the biggest, if reversed), so the first one to be replaced is always on top
+    if reverse:
+        heap = BinaryHeap(BinaryHeap.MIN_HEAP, key, native)
+    else:
+        heap = BinaryHeap(BinaryHeap.MAX_HEAP, key, native)
+
+    heap.array = array
+    if key is not None:
+        heap.keys = [key(value) for value in array]
+    priorities = heap.array if heap.keys is None else heap.keys
+
+    heap.heapify(k)
+
+    for index in range(k, len(array)):
+        if heap.higher(priorities[0], priorities[index]):
+            heap.swap_elements(0, index)
+            heap.sift_down(0, k)
+
+    # Sort the front by repeatedly moving the top of the heap to the end of the heap
+    for end in range(k - 1, 0, -1):
+        heap.swap_elements(0, end)
+        heap.sift_down(0, end)
\ No newline at end of file
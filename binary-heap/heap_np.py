@@ -8,24 +8,89 @@
      -1: Object calling the method is less than the one used as an argument
 
    Ex) object1.compare(object2)
+
+   As with heap.py, the heap can instead order elements natively (native=True) or by a
+   key function whose result is cached alongside each element (key=function).
+
+   Both classes take an 'arity' (number of children per node, 2 by default) as in heap.py.
+
+   heapsort() and partial_sort() sort a numpy array in place, as in heap.py.
+
+   The arrays are managed by capacity: they grow by a growth factor when full, can be
+   preallocated with reserve(), and can optionally shrink again as elements are popped (see
+   ResizableArray below).
+
+   NumericBinaryHeap is a heap for numeric priorities. Priorities are stored in a contiguous
+   float64/int64 array, with a parallel int64 array of indices that identify each priority's
+   payload (eg. a row number in the caller's own table). Building the heap and answering
+   nsmallest()/nlargest() queries are vectorized rather than element-by-element.
 """
 
 import numpy as np
-
-class BinaryHeap:
+from heap import priority_function
+from heap_stats import HeapStats, instrument, uninstrument
+
+class ResizableArray:
+    """ Capacity management shared by the heaps in this module. Subclasses keep 'num_elements'
+    and implement get_size() and set_capacity().
+
+    Full arrays grow by 'growth_factor'. If 'shrink_ratio' is set, the arrays shrink back to
+    'growth_factor' times the number of elements once fewer than 'shrink_ratio' of their slots are
+    in use. 'shrink_ratio' should be below 1 / growth_factor, so that a shrink is never followed by
+    an immediate growth. """
+
+    def init_capacity(self, capacity, growth_factor, shrink_ratio):
+        self.min_capacity = max(capacity, 1)
+        self.growth_factor = growth_factor
+        self.shrink_ratio = shrink_ratio
+
+    def reserve(self, capacity):
+        """ Makes room for at least 'capacity' elements, so that adding them will not resize the arrays. """
+        if capacity > self.get_size():
+            self.set_capacity(capacity)
+
+    def shrink_to_fit(self):
+        """ Releases every unused slot (down to the initial capacity). """
+        if self.get_size() > max(self.num_elements, self.min_capacity):
+            self.set_capacity(max(self.num_elements, self.min_capacity))
+
+    # Grows the arrays geometrically, so that the copying cost of n adds is O(n) in total
+    def ensure_capacity(self, required):
+        size = self.get_size()
+        if required > size:
+            self.set_capacity(max(required, int(size * self.growth_factor), size + 1))
+
+    def shrink_if_sparse(self):
+        size = self.get_size()
+        if size > self.min_capacity and self.num_elements < size * self.shrink_ratio:
+            self.set_capacity(max(int(self.num_elements * self.growth_factor), self.min_capacity))
+
+class BinaryHeap(ResizableArray):
 
     MIN_HEAP = 0 
     MAX_HEAP = 1
 
-    def __init__(self, heap_type):
+    def __init__(self, heap_type, key=None, native=False, arity=2, capacity=8, growth_factor=2, shrink_ratio=None):
 
-        # Array will doube in size if full
-        self.array = np.empty(8, dtype='object')
+        # Array will grow by 'growth_factor' if full
+        self.init_capacity(capacity, growth_factor, shrink_ratio)
+        self.array = np.empty(self.min_capacity, dtype='object')
 
         # Keep track of number of items in array
         self.num_elements = 0
         
         self.heap_type = heap_type
+        self.arity = arity
+
+        # Cached keys, parallel to 'array' (None if no key function is used)
+        self.key = key
+        self.keys = None if key is None else np.empty(self.min_capacity, dtype='object')
+
+        # higher(x, y) is True if priority x belongs above priority y
+        self.higher = priority_function(heap_type, native or key is not None)
+
+        # Counters, while instrumentation is enabled (see enable_stats())
+        self.stats = None
 
     # Number of actual elements in the heap
     def get_length(self):
@@ -38,6 +103,44 @@ class BinaryHeap:
     def get_array(self):
         return self.array
 
+    def enable_stats(self, hook=None):
+        """ Starts counting comparisons, swaps, sift path lengths and resizes (see heap_stats.py),
+        and returns the HeapStats object holding the counts. """
+
+        if self.stats is not None:
+            self.disable_stats()
+
+        self.stats = HeapStats()
+        instrument(self, self.stats, hook)
+        return self.stats
+
+    def disable_stats(self):
+        if self.stats is not None:
+            uninstrument(self)
+            self.stats = None
+
+    def set_capacity(self, capacity):
+        """ Reallocates the arrays with room for 'capacity' elements (at least the number of elements
+        in the heap). Only the elements in the heap are copied. """
+
+        capacity = max(capacity, self.num_elements)
+
+        array = np.empty(capacity, dtype='object')
+        array[:self.num_elements] = self.array[:self.num_elements]
+        self.array = array
+
+        if self.keys is not None:
+            keys = np.empty(capacity, dtype='object')
+            keys[:self.num_elements] = self.keys[:self.num_elements]
+            self.keys = keys
+
+    # The value used for ordering the element at 'index' (its cached key, or the element itself)
+    def get_priority(self, index):
+        if self.keys is None:
+            return self.array[index]
+        else:
+            return self.keys[index]
+
     # Determines the existence of a left child
     def left_child_exist(self, index):
         if (self.left_child(index) > self.num_elements - 1):
@@ -52,15 +155,15 @@ class BinaryHeap:
         else:
             return True
 
-    # Node parent/child calculations
+    # Node parent/child calculations (the right child is the last of a node's 'arity' children)
     def parent(self, index):
-        return (index - 1) // 2
+        return (index - 1) // self.arity
 
     def left_child(self, index):
-        return (2 * index + 1)
+        return (self.arity * index + 1)
 
     def right_child(self, index):
-        return (2 * index + 2)
+        return (self.arity * index + self.arity)
 
     def is_empty(self):
         if self.num_elements == 0:
@@ -73,36 +176,43 @@ class BinaryHeap:
         if self.num_elements == 0:
             return
 
-        index = self.num_elements - 1
+        # Leaves are already heaps, so start from the parent of the last element
+        index = self.parent(self.num_elements - 1)
 
         while(index >= 0):
             self.sift_down(index)
             index = index - 1        
 
-    def build(self, array):
+    def build(self, array, length=None):
         """ This method builds the heap from an array by iterating from the last element of the array to
         the first element of the array, calling sift_down() on each iteration. The 'array' argument 
-        must be a numpy array of type 'object'. """
-
-        if array.size == 0:
+        must be a numpy array of type 'object'. Only its first 'length' elements (by default, all of
+        them) are used, and the rest of the array is kept as spare capacity. """
+
+        if length is None:
+            length = array.size
+        if length > array.size:
+            raise ValueError("length %d is larger than the array (%d elements)" % (length, array.size))
+        if length == 0:
             return
 
         self.array = array
+        self.num_elements = length
 
-        # The array passed in the argument must be full (num elements in array must equal array.size)
-        self.num_elements = self.array.size
+        if self.keys is not None:
+            self.keys = np.empty(self.array.size, dtype='object')
+            for index in range(self.num_elements):
+                self.keys[index] = self.key(self.array[index])
         
         self.heapify()
 
     def add(self, value):
         if self.num_elements == self.array.size:
-            if self.num_elements == 0:
-                np.resize(self.array, 2)
-            else:
-                new_size = self.array.size * 2
-                self.array = np.resize(self.array, int(new_size))
+            self.ensure_capacity(self.num_elements + 1)
 
         self.array[self.num_elements] = value
+        if self.keys is not None:
+            self.keys[self.num_elements] = self.key(value)
         self.sift_up(self.num_elements)
         self.num_elements = self.num_elements + 1
 
@@ -110,76 +220,482 @@ class BinaryHeap:
         value = None
         if self.num_elements > 0:
             value = self.array[0]
-            if self.array.size > 1:
-                self.array[0] = self.array[self.num_elements - 1]
-                self.num_elements = self.num_elements - 1
+            self.num_elements = self.num_elements - 1
+            last = self.num_elements
+
+            if last > 0:
+                self.array[0] = self.array[last]
+                if self.keys is not None:
+                    self.keys[0] = self.keys[last]
+
+            # Release the vacated slot's reference
+            self.array[last] = None
+            if self.keys is not None:
+                self.keys[last] = None
+
+            if last > 0:
                 self.sift_down(0)
-            else:
-                self.num_elements = self.num_elements - 1
+            if self.shrink_ratio is not None:
+                self.shrink_if_sparse()
         return value
 
+    def push_many(self, values):
+        """ Adds every value of an iterable. Each new element is sifted up, unless the batch is at
+        least as big as the heap, in which case the whole array is heapified instead. """
+
+        values = list(values)
+        count = len(values)
+        if count == 0:
+            return
+
+        start = self.num_elements
+        self.ensure_capacity(start + count)
+
+        for offset, value in enumerate(values):
+            self.array[start + offset] = value
+            if self.keys is not None:
+                self.keys[start + offset] = self.key(value)
+        self.num_elements = start + count
+
+        if count >= start:
+            self.heapify()
+        else:
+            for index in range(start, start + count):
+                self.sift_up(index)
+
+    def pop_many(self, k):
+        """ Removes and returns the top 'k' elements (fewer if the heap is smaller), in heap order. """
+
+        values = []
+        while len(values) < k and self.num_elements > 0:
+            values.append(self.pop())
+        return values
+
     def swap_elements(self, x, y):
-        temp = self.array[x]
-        self.array[x] = self.array[y]
-        self.array[y] = temp
+        array = self.array
+        array[x], array[y] = array[y], array[x]
+        if self.keys is not None:
+            keys = self.keys
+            keys[x], keys[y] = keys[y], keys[x]
 
     def sift_up(self, index):
-        complete = False
-
-        while (index > 0 and complete == False):
-            parent_index = self.parent(index)
-            if(self.heap_type == BinaryHeap.MAX_HEAP):
-                if(self.array[index].compare(self.array[parent_index]) == 1):
-                    self.swap_elements(index, parent_index)
-                    index = parent_index
-                else:
-                    complete = True
-            elif(self.heap_type == BinaryHeap.MIN_HEAP):
-                if(self.array[index].compare(self.array[parent_index]) == -1):
-                    self.swap_elements(index, parent_index)
-                    index = parent_index
-                else:
-                    complete = True
+        higher = self.higher
+        arity = self.arity
+        priorities = self.array if self.keys is None else self.keys
+
+        while index > 0:
+            parent_index = (index - 1) // arity
+            if higher(priorities[index], priorities[parent_index]):
+                self.swap_elements(index, parent_index)
+                index = parent_index
+            else:
+                break
 
     def sift_down(self, index):
-        complete = False
-        z_index = -1
-        while(index < self.num_elements and complete == False):
-
-            # existence of children
-            if(self.left_child_exist(index)):
-                if(self.right_child_exist(index)):
-                
-                    # determine smaller/bigger value by heap type
-                    if(self.heap_type == BinaryHeap.MAX_HEAP):
-                        if(self.array[self.left_child(index)].compare(self.array[self.right_child(index)]) == 1):
-                            z_index = self.left_child(index)
-                        else:
-                            z_index = self.right_child(index)
-                    elif(self.heap_type == BinaryHeap.MIN_HEAP):
-                        if(self.array[self.left_child(index)].compare(self.array[self.right_child(index)]) == -1):
-                            z_index = self.left_child(index)
-                        else:
-                            z_index = self.right_child(index)
-
-                # only left child exist, use this value to compare with parent
-                else:
-                    z_index = self.left_child(index)
-
-                # Swap if necessary, depending on heap type
-                if(self.heap_type == BinaryHeap.MAX_HEAP):
-                    if(self.array[z_index].compare(self.array[index]) == 1):
-                        self.swap_elements(z_index, index)
-                        index = z_index
-                    else:
-                        complete = True
-                if(self.heap_type == BinaryHeap.MIN_HEAP):
-                    if(self.array[z_index].compare(self.array[index]) == -1):
-                        self.swap_elements(z_index, index)
-                        index = z_index
-                    else:
-                        complete = True
+        higher = self.higher
+        arity = self.arity
+        priorities = self.array if self.keys is None else self.keys
+        length = self.num_elements
+
+        while True:
+            z_index = arity * index + 1
 
             # No child exists, therefore exit loop
+            if z_index >= length:
+                break
+
+            # Find the child with the highest priority
+            for child in range(z_index + 1, min(z_index + arity, length)):
+                if higher(priorities[child], priorities[z_index]):
+                    z_index = child
+
+            # Swap if the child belongs above its parent
+            if higher(priorities[z_index], priorities[index]):
+                self.swap_elements(z_index, index)
+                index = z_index
             else:
-                complete = True
\ No newline at end of file
+                break
+
+def heapsort(array, reverse=False, key=None, native=False):
+    """ Sorts a numpy array in place, in ascending order (descending if 'reverse' is True). Elements
+    are ordered as in BinaryHeap (native=True for numeric arrays); no memory is allocated unless a
+    key function is used. """
+
+    partial_sort(array, array.size, reverse, key, native)
+
+def partial_sort(array, k, reverse=False, key=None, native=False):
+    """ Moves the 'k' smallest elements of a numpy array (the 'k' biggest if 'reverse' is True) to its
+    front, in sorted order, in place. The order of the remaining elements is unspecified. """
+
+    k = min(k, array.size)
+    if k <= 0:
+        return
+
+    # The front of the array is a max heap of the k smallest elements seen so far (a min heap of
+    # the biggest, if reversed), so the first one to be replaced is always on top
+    if reverse:
+        heap = BinaryHeap(BinaryHeap.MIN_HEAP, key, native, capacity=1)
+    else:
+        heap = BinaryHeap(BinaryHeap.MAX_HEAP, key, native, capacity=1)
+
+    heap.array = array
+    if key is not None:
+        heap.keys = np.empty(array.size, dtype='object')
+        for index in range(array.size):
+            heap.keys[index] = key(array[index])
+    priorities = heap.array if heap.keys is None else heap.keys
+
+    heap.num_elements = k
+    heap.heapify()
+
+    for index in range(k, array.size):
+        if heap.higher(priorities[0], priorities[index]):
+            heap.swap_elements(0, index)
+            heap.sift_down(0)
+
+    # Sort the front by repeatedly moving the top of the heap to the end of the heap
+    for end in range(k - 1, 0, -1):
+        heap.swap_elements(0, end)
+        heap.num_elements = end
+        heap.sift_down(0)
+
+class NumericBinaryHeap(ResizableArray):
+
+    MIN_HEAP = 0
+    MAX_HEAP = 1
+
+    def __init__(self, heap_type, dtype='float64', arity=2, capacity=8, growth_factor=2, shrink_ratio=None):
+
+        # Priorities and their payload indices, parallel arrays which grow by 'growth_factor' if full
+        self.init_capacity(capacity, growth_factor, shrink_ratio)
+        self.priorities = np.empty(self.min_capacity, dtype=dtype)
+        self.indices = np.empty(self.min_capacity, dtype='int64')
+
+        # Keep track of number of items in the arrays
+        self.num_elements = 0
+
+        # Index given to the next priority added without one
+        self.next_index = 0
+
+        self.heap_type = heap_type
+        self.arity = arity
+
+        # Scalar and vectorized comparisons: higher(x, y) is True if priority x belongs above priority y,
+        # and vector_best() finds the position of the highest priority along an axis
+        self.higher = priority_function(heap_type, True)
+        if heap_type == NumericBinaryHeap.MAX_HEAP:
+            self.vector_higher = np.greater
+            self.vector_best = np.argmax
+        else:
+            self.vector_higher = np.less
+            self.vector_best = np.argmin
+
+    # Number of actual elements in the heap
+    def get_length(self):
+        return self.num_elements
+
+    # Array size used for heap (number of proper items may be lower)
+    def get_size(self):
+        return self.priorities.size
+
+    def set_capacity(self, capacity):
+        """ Reallocates the arrays with room for 'capacity' elements (at least the number of elements
+        in the heap). Only the elements in the heap are copied. """
+
+        capacity = max(capacity, self.num_elements)
+
+        priorities = np.empty(capacity, dtype=self.priorities.dtype)
+        priorities[:self.num_elements] = self.priorities[:self.num_elements]
+        self.priorities = priorities
+
+        indices = np.empty(capacity, dtype='int64')
+        indices[:self.num_elements] = self.indices[:self.num_elements]
+        self.indices = indices
+
+    # Priorities and indices of the elements in the heap, in heap order (views, not copies)
+    def get_priorities(self):
+        return self.priorities[:self.num_elements]
+
+    def get_indices(self):
+        return self.indices[:self.num_elements]
+
+    def is_empty(self):
+        if self.num_elements == 0:
+            return True
+        else:
+            return False
+
+    def heapify(self):
+        """ Organizes the arrays into a binary heap, bottom-up one level at a time. The nodes of a
+        level have disjoint subtrees, so they are all sifted down together with array operations. """
+
+        length = self.num_elements
+        if length < 2:
+            return
+
+        priorities = self.priorities
+        indices = self.indices
+        arity = self.arity
+        vector_higher = self.vector_higher
+        vector_best = self.vector_best
+        offsets = np.arange(1, arity + 1)
+
+        # Start at the deepest level that has a node with children
+        last_parent = (length - 2) // arity
+        level_starts = [0]
+        while level_starts[-1] * arity + 1 <= last_parent:
+            level_starts.append(level_starts[-1] * arity + 1)
+
+        for level_start in reversed(level_starts):
+            nodes = np.arange(level_start, min(level_start * arity, last_parent) + 1)
+
+            while nodes.size > 0:
+
+                # determine the highest-priority child of each node (missing children repeat the first child)
+                children = arity * nodes[:, np.newaxis] + offsets
+                children = np.where(children < length, children, children[:, :1])
+                best = vector_best(priorities[children], axis=1)
+                children = children[np.arange(nodes.size), best]
+
+                # swap the nodes whose child belongs above them, then continue from those children
+                swap = vector_higher(priorities[children], priorities[nodes])
+                nodes = nodes[swap]
+                children = children[swap]
+
+                temp = priorities[nodes]
+                priorities[nodes] = priorities[children]
+                priorities[children] = temp
+                temp = indices[nodes]
+                indices[nodes] = indices[children]
+                indices[children] = temp
+
+                nodes = children[arity * children + 1 < length]
+
+    def build(self, priorities, indices=None, length=None):
+        """ Builds the heap from an array of priorities. 'indices' holds the payload index of each
+        priority, and defaults to each priority's position in the array. Only the first 'length'
+        elements (by default, all of them) are used, and the rest of the priorities is kept as spare
+        capacity ('indices' may stop after the first 'length'). Arrays which already have the heap's
+        dtypes are used in place rather than copied. """
+
+        priorities = np.ascontiguousarray(priorities, dtype=self.priorities.dtype)
+        if length is None:
+            length = priorities.size
+        if length > priorities.size:
+            raise ValueError("length %d is larger than the priorities (%d elements)" % (length, priorities.size))
+        if length == 0:
+            return
+
+        if indices is None:
+            indices = np.arange(priorities.size, dtype='int64')
+        else:
+            indices = np.ascontiguousarray(indices, dtype='int64')
+            if indices.size < length:
+                raise ValueError("%d indices given for %d priorities" % (indices.size, length))
+
+            # Both arrays must have the same spare capacity, so shorter indices are copied into a full-size array
+            if indices.size < priorities.size:
+                padded = np.empty(priorities.size, dtype='int64')
+                padded[:length] = indices[:length]
+                indices = padded
+
+        self.priorities = priorities
+        self.indices = indices
+        self.num_elements = length
+        self.next_index = max(self.next_index, int(indices[:length].max()) + 1)
+
+        self.heapify()
+
+    def add(self, priority, index=None):
+        """ Adds a priority with its payload index (by default, a new running index), and returns the index. """
+
+        if index is None:
+            index = self.next_index
+        self.next_index = max(self.next_index, index + 1)
+
+        if self.num_elements == self.priorities.size:
+            self.ensure_capacity(self.num_elements + 1)
+
+        self.priorities[self.num_elements] = priority
+        self.indices[self.num_elements] = index
+        self.num_elements = self.num_elements + 1
+        self.sift_up(self.num_elements - 1)
+
+        return index
+
+    def push_many(self, priorities, indices=None):
+        """ Adds an array of priorities with their payload indices (by default, new running indices),
+        and returns the indices. Each new element is sifted up, unless the batch is at least as big
+        as the heap, in which case the whole array is heapified instead. """
+
+        priorities = np.asarray(priorities, dtype=self.priorities.dtype).ravel()
+        count = priorities.size
+        if count == 0:
+            return np.empty(0, dtype='int64')
+
+        if indices is None:
+            indices = np.arange(self.next_index, self.next_index + count, dtype='int64')
+        else:
+            indices = np.asarray(indices, dtype='int64').ravel()
+            if indices.size != count:
+                raise ValueError("%d indices given for %d priorities" % (indices.size, count))
+        self.next_index = max(self.next_index, int(indices.max()) + 1)
+
+        start = self.num_elements
+        end = start + count
+        self.ensure_capacity(end)
+
+        self.priorities[start:end] = priorities
+        self.indices[start:end] = indices
+        self.num_elements = end
+
+        if count >= start:
+            self.heapify()
+        else:
+            for index in range(start, end):
+                self.sift_up(index)
+
+        return indices
+
+    def pop_many(self, k):
+        """ Removes the top 'k' elements (fewer if the heap is smaller) and returns their priorities
+        and indices in heap order, as two arrays. Small batches are popped one at a time; bigger ones
+        are selected together and the rest of the heap is rebuilt, which is O(n). """
+
+        length = self.num_elements
+        k = min(k, length)
+        if k <= 0:
+            return (np.empty(0, dtype=self.priorities.dtype), np.empty(0, dtype='int64'))
+
+        if k * length.bit_length() < length:
+            priorities = np.empty(k, dtype=self.priorities.dtype)
+            indices = np.empty(k, dtype='int64')
+            for position in range(k):
+                priorities[position], indices[position] = self.pop()
+            return (priorities, indices)
+
+        selected = self.select_positions(k, self.heap_type == NumericBinaryHeap.MAX_HEAP)
+        priorities = self.priorities[selected]
+        indices = self.indices[selected]
+
+        remaining = np.ones(length, dtype=bool)
+        remaining[selected] = False
+        rest = length - k
+        self.priorities[:rest] = self.priorities[:length][remaining]
+        self.indices[:rest] = self.indices[:length][remaining]
+        self.num_elements = rest
+        self.heapify()
+
+        if self.shrink_ratio is not None:
+            self.shrink_if_sparse()
+
+        return (priorities, indices)
+
+    # Returns the top (priority, index) pair without removing it, or None if the heap is empty
+    def peek(self):
+        if self.num_elements == 0:
+            return None
+        else:
+            return (self.priorities[0].item(), int(self.indices[0]))
+
+    def pop(self):
+        """ Removes the top element and returns it as a (priority, index) pair, or returns None if the heap is empty. """
+
+        if self.num_elements == 0:
+            return None
+
+        value = (self.priorities[0].item(), int(self.indices[0]))
+        self.num_elements = self.num_elements - 1
+
+        if self.num_elements > 0:
+            self.priorities[0] = self.priorities[self.num_elements]
+            self.indices[0] = self.indices[self.num_elements]
+            self.sift_down(0)
+
+        if self.shrink_ratio is not None:
+            self.shrink_if_sparse()
+
+        return value
+
+    def nsmallest(self, k):
+        """ Returns the 'k' smallest priorities in ascending order and their indices, as two arrays.
+        The heap is not modified. """
+
+        selected = self.select_positions(k, False)
+        return (self.priorities[selected], self.indices[selected])
+
+    def nlargest(self, k):
+        """ Returns the 'k' largest priorities in descending order and their indices, as two arrays.
+        The heap is not modified. """
+
+        selected = self.select_positions(k, True)
+        return (self.priorities[selected], self.indices[selected])
+
+    # Positions of the 'k' smallest (or largest) priorities in the heap, sorted by priority
+    def select_positions(self, k, largest):
+        length = self.num_elements
+        k = min(k, length)
+        if k <= 0:
+            return np.empty(0, dtype='int64')
+
+        priorities = self.priorities[:length]
+        if largest:
+            selected = np.argpartition(priorities, length - k)[length - k:]
+            return selected[np.argsort(priorities[selected], kind='stable')[::-1]]
+        else:
+            selected = np.argpartition(priorities, k - 1)[:k]
+            return selected[np.argsort(priorities[selected], kind='stable')]
+
+    # The sift methods move a "hole" along the path and write the sifted element once at the end
+    def sift_up(self, index):
+        priorities = self.priorities
+        indices = self.indices
+        higher = self.higher
+        arity = self.arity
+
+        priority = priorities[index]
+        payload = indices[index]
+
+        while index > 0:
+            parent_index = (index - 1) // arity
+            if higher(priority, priorities[parent_index]):
+                priorities[index] = priorities[parent_index]
+                indices[index] = indices[parent_index]
+                index = parent_index
+            else:
+                break
+
+        priorities[index] = priority
+        indices[index] = payload
+
+    def sift_down(self, index):
+        priorities = self.priorities
+        indices = self.indices
+        higher = self.higher
+        arity = self.arity
+        length = self.num_elements
+
+        priority = priorities[index]
+        payload = indices[index]
+
+        while True:
+            z_index = arity * index + 1
+
+            # No child exists, therefore exit loop
+            if z_index >= length:
+                break
+
+            # Find the child with the highest priority
+            for child in range(z_index + 1, min(z_index + arity, length)):
+                if higher(priorities[child], priorities[z_index]):
+                    z_index = child
+
+            if higher(priorities[z_index], priority):
+                priorities[index] = priorities[z_index]
+                indices[index] = indices[z_index]
+                index = z_index
+            else:
+                break
+
+        priorities[index] = priority
+        indices[index] = payload
\ No newline at end of file
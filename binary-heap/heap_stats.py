@@ -0,0 +1,122 @@
+""" Instrumentation for the BinaryHeap classes in heap.py and heap_np.py
+   heap.enable_stats() replaces the heap's comparison function and its swap_elements(), sift_up(),
+   sift_down() and add()/pop()/push_many()/pop_many() methods, on that heap object only, with
+   wrappers which count:
+     comparisons, swaps: calls to the comparison function and to swap_elements()
+     sift_ups, sift_downs: calls to sift_up() and sift_down()
+     sift_up_levels, sift_down_levels: levels moved by those sifts (the length of their paths)
+     max_sift_levels: the longest sift path
+     resizes: reallocations of the heap's array
+     operations: calls to add(), pop(), push_many() and pop_many() (pop_many() also counts its pops)
+
+   heap.disable_stats() puts the original functions back. Heaps which never enable stats run the
+   original code, without any checks for instrumentation.
+
+   If a hook is given, it is called after every operation as hook(operation, counts), where
+   'counts' is a snapshot of what that operation cost.
+"""
+
+import sys
+
+COUNTERS = ["comparisons", "swaps", "sift_ups", "sift_downs", "sift_up_levels", "sift_down_levels", "resizes"]
+OPERATIONS = ["add", "pop", "push_many", "pop_many"]
+
+class HeapStats:
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        for counter in COUNTERS:
+            setattr(self, counter, 0)
+        self.max_sift_levels = 0
+        self.operations = {operation : 0 for operation in OPERATIONS}
+
+    def snapshot(self):
+        """ Returns the counters as a dictionary. """
+
+        counts = {counter : getattr(self, counter) for counter in COUNTERS}
+        counts["max_sift_levels"] = self.max_sift_levels
+        counts["operations"] = dict(self.operations)
+        return counts
+
+def instrument(heap, stats, hook=None):
+    """ Replaces the heap's comparison function and methods with counting wrappers (see above). """
+
+    higher = heap.higher
+    def counting_higher(x, y):
+        stats.comparisons = stats.comparisons + 1
+        return higher(x, y)
+    heap.higher = counting_higher
+
+    swap_elements = heap.swap_elements
+    def counting_swap_elements(x, y):
+        stats.swaps = stats.swaps + 1
+        swap_elements(x, y)
+    heap.swap_elements = counting_swap_elements
+
+    heap.sift_up = counting_sift(stats, heap.sift_up, "sift_ups", "sift_up_levels")
+    heap.sift_down = counting_sift(stats, heap.sift_down, "sift_downs", "sift_down_levels")
+
+    # List-backed heaps resize inside list operations, so their allocated size is compared instead
+    if isinstance(heap.array, list):
+        measure = lambda: sys.getsizeof(heap.array)
+    else:
+        measure = None
+        set_capacity = heap.set_capacity
+        def counting_set_capacity(capacity):
+            stats.resizes = stats.resizes + 1
+            set_capacity(capacity)
+        heap.set_capacity = counting_set_capacity
+
+    for operation in OPERATIONS:
+        setattr(heap, operation, counting_operation(stats, getattr(heap, operation), operation, measure, hook))
+
+    heap.uninstrumented_higher = higher
+
+def uninstrument(heap):
+    """ Puts back the heap's original comparison function and methods. """
+
+    heap.higher = heap.uninstrumented_higher
+    del heap.uninstrumented_higher
+
+    for name in ["swap_elements", "sift_up", "sift_down", "set_capacity"] + OPERATIONS:
+        heap.__dict__.pop(name, None)
+
+def counting_sift(stats, sift, calls, levels):
+
+    # Every level moved is one swap, so a sift's path length is the number of swaps it made
+    def counting(*args):
+        swaps = stats.swaps
+        sift(*args)
+
+        moved = stats.swaps - swaps
+        setattr(stats, calls, getattr(stats, calls) + 1)
+        setattr(stats, levels, getattr(stats, levels) + moved)
+        if moved > stats.max_sift_levels:
+            stats.max_sift_levels = moved
+
+    return counting
+
+def counting_operation(stats, method, operation, measure, hook):
+
+    def counting(*args):
+        stats.operations[operation] = stats.operations[operation] + 1
+
+        if hook is not None:
+            before = stats.snapshot()
+        if measure is not None:
+            size = measure()
+
+        result = method(*args)
+
+        if measure is not None and measure() != size:
+            stats.resizes = stats.resizes + 1
+        if hook is not None:
+            after = stats.snapshot()
+            counts = {counter : after[counter] - before[counter] for counter in COUNTERS}
+            hook(operation, counts)
+
+        return result
+
+    return counting
\ No newline at end of file
@@ -0,0 +1,182 @@
+""" Implementation of an indexed (addressable) binary heap
+   This class extends BinaryHeap so that elements can be found and re-prioritized after they
+   have been added.
+
+   add() returns a handle for the new element. The heap keeps a position map from each handle
+   to the element's current index, which is updated whenever two elements are swapped, so the
+   following operations run in O(log n):
+     decrease_key(handle, value): replace an element with a smaller one
+     increase_key(handle, value): replace an element with a bigger one
+     update(handle, value): replace an element with any other
+     remove(handle): remove an element from the heap
+
+   "Smaller" and "bigger" are determined by the heap's ordering mode (compare(), native
+   comparison or the cached key), in the same way as in heap.py.
+"""
+
+from heap import BinaryHeap
+
+class IndexedBinaryHeap(BinaryHeap):
+
+    def __init__(self, heap_type, key=None, native=False, arity=2):
+        super().__init__(heap_type, key, native, arity)
+
+        # handles[index] is the handle of the element at 'index', positions[handle] is its index
+        self.handles = []
+        self.positions = {}
+        self.next_handle = 0
+
+    def contains(self, handle):
+        return handle in self.positions
+
+    # Returns the element of 'handle', or None if the handle is not in the heap
+    def get(self, handle):
+        if handle in self.positions:
+            return self.array[self.positions[handle]]
+        else:
+            return None
+
+    # Builds the heap from an array, returning the handles of the elements in array order
+    def build(self, array):
+        if len(array) == 0:
+            return []
+
+        handles = list(range(self.next_handle, self.next_handle + len(array)))
+        self.next_handle = self.next_handle + len(array)
+
+        self.handles = list(handles)
+        self.positions = {handle : index for index, handle in enumerate(handles)}
+        super().build(array)
+
+        return handles
+
+    def add(self, value):
+        handle = self.next_handle
+        self.next_handle = self.next_handle + 1
+
+        self.handles.append(handle)
+        self.positions[handle] = len(self.array)
+        super().add(value)
+
+        return handle
+
+    # Adds every value of an iterable, returning their handles
+    def push_many(self, values):
+        values = list(values)
+
+        handles = list(range(self.next_handle, self.next_handle + len(values)))
+        self.next_handle = self.next_handle + len(values)
+
+        for handle in handles:
+            self.positions[handle] = len(self.handles)
+            self.handles.append(handle)
+        super().push_many(values)
+
+        return handles
+
+    def pop_many(self, k):
+        values = []
+        while len(values) < k and len(self.array) > 0:
+            values.append(self.pop())
+        return values
+
+    # The top element's handle must not be reused for another value, so these are not done in place
+    def pushpop(self, value):
+        self.add(value)
+        return self.pop()
+
+    def replace(self, value):
+        top = self.pop()
+        self.add(value)
+        return top
+
+    def pop(self):
+        if len(self.array) == 0:
+            return None
+        else:
+            return self.remove_index(0)
+
+    # Removes the element of 'handle' and returns it, or returns None if the handle is not in the heap
+    def remove(self, handle):
+        if handle in self.positions:
+            return self.remove_index(self.positions[handle])
+        else:
+            return None
+
+    def remove_index(self, index):
+        last = len(self.array) - 1
+        if index != last:
+            self.swap_elements(index, last)
+
+        value = self.array.pop()
+        if self.keys is not None:
+            self.keys.pop()
+        del self.positions[self.handles.pop()]
+
+        # The element moved into 'index' may belong either above or below it
+        if index < last:
+            moved = self.handles[index]
+            self.sift_up(index)
+            self.sift_down(self.positions[moved])
+
+        return value
+
+    def decrease_key(self, handle, value):
+        """ Replaces the element of 'handle' with 'value', which must not be bigger than the current
+        element. Returns False if the handle is not in the heap or 'value' is bigger. """
+        return self.change_key(handle, value, True)
+
+    def increase_key(self, handle, value):
+        """ Replaces the element of 'handle' with 'value', which must not be smaller than the current
+        element. Returns False if the handle is not in the heap or 'value' is smaller. """
+        return self.change_key(handle, value, False)
+
+    def change_key(self, handle, value, decrease):
+        if handle not in self.positions:
+            return False
+
+        index = self.positions[handle]
+        old_priority = self.get_priority(index)
+        new_priority = value if self.keys is None else self.key(value)
+
+        # Decreasing raises an element's priority in a min heap, and lowers it in a max heap
+        raise_priority = (self.heap_type == BinaryHeap.MIN_HEAP) == decrease
+
+        if raise_priority and self.higher(old_priority, new_priority):
+            return False
+        if not raise_priority and self.higher(new_priority, old_priority):
+            return False
+
+        self.array[index] = value
+        if self.keys is not None:
+            self.keys[index] = new_priority
+
+        if raise_priority:
+            self.sift_up(index)
+        else:
+            self.sift_down(index)
+
+        return True
+
+    # Replaces the element of 'handle' with any value. Returns False if the handle is not in the heap.
+    def update(self, handle, value):
+        if handle not in self.positions:
+            return False
+
+        index = self.positions[handle]
+        self.array[index] = value
+        if self.keys is not None:
+            self.keys[index] = self.key(value)
+
+        self.sift_up(index)
+        self.sift_down(self.positions[handle])
+
+        return True
+
+    def swap_elements(self, x, y):
+        super().swap_elements(x, y)
+
+        handles = self.handles
+        handles[x], handles[y] = handles[y], handles[x]
+        self.positions[handles[x]] = x
+        self.positions[handles[y]] = y
\ No newline at end of file
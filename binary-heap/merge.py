@@ -0,0 +1,72 @@
+""" K-way merge of sorted iterables
+   merge(*iterables) lazily merges iterables which are each sorted (ascending for a MIN_HEAP
+   merge, descending for a MAX_HEAP merge) into one sorted generator. Only the head element of
+   each source is held in the heap at a time, and nothing is read from a source until its
+   previous element has been yielded.
+
+   Equal elements are yielded in the order of their sources (the first iterable first), and in
+   their original order within a source, so the merge is stable.
+
+   Elements are ordered as in heap.py: with compare(), natively (native=True) or by a key
+   (key=function).
+"""
+
+from compares import ComparesInterface
+from heap import BinaryHeap
+
+# Returned by next() once a source has no more elements
+EXHAUSTED = object()
+
+# Head element of a source, ordered by its value, then by its source's position
+class MergeEntry(ComparesInterface):
+
+    def __init__(self, value, iterator, tie):
+        self.value = value
+        self.iterator = iterator
+        self.tie = tie
+
+    def compare(self, object):
+        result = self.value.compare(object.value)
+
+        if result == 0:
+            if self.tie > object.tie:
+                result = 1
+            elif self.tie < object.tie:
+                result = -1
+
+        return result
+
+def merge(*iterables, heap_type=BinaryHeap.MIN_HEAP, key=None, native=False):
+
+    # The earlier source wins a tie: it is the smaller one in a min heap, and the bigger one in a max heap
+    if heap_type == BinaryHeap.MAX_HEAP:
+        sign = -1
+    else:
+        sign = 1
+
+    if key is not None:
+        heap = BinaryHeap(heap_type, key=lambda entry: (key(entry.value), entry.tie))
+    elif native:
+        heap = BinaryHeap(heap_type, key=lambda entry: (entry.value, entry.tie))
+    else:
+        heap = BinaryHeap(heap_type)
+
+    heads = []
+    for source, iterable in enumerate(iterables):
+        iterator = iter(iterable)
+        value = next(iterator, EXHAUSTED)
+        if value is not EXHAUSTED:
+            heads.append(MergeEntry(value, iterator, sign * source))
+    heap.build(heads)
+
+    while not heap.is_empty():
+        entry = heap.peek()
+        yield entry.value
+
+        # Replace the head of the source with its next element, or drop the source once it is exhausted
+        value = next(entry.iterator, EXHAUSTED)
+        if value is EXHAUSTED:
+            heap.pop()
+        else:
+            entry.value = value
+            heap.replace(entry)
\ No newline at end of file
@@ -0,0 +1,157 @@
+""" Implementation of a numeric heap stored in a memory-mapped file
+   MemmapNumericHeap is a NumericBinaryHeap (heap_np.py) whose elements are fixed-width records
+   in a numpy.memmap, so a heap bigger than the available memory is paged to and from disk by
+   the operating system rather than running out of memory.
+
+   File layout:
+     header: int64[16] = magic, version, num_elements, next_index, capacity, heap_type, arity,
+                         dtype code, dirty, unused
+     records: capacity x (priority: float64/int64, offset: int64)
+   Each record holds a priority and the offset of its payload in the caller's own storage (the
+   'index' of a NumericBinaryHeap element). The file grows by 'growth_factor' when full.
+
+   Records are changed in place, and the operating system may write them to disk at any time, but
+   the element count in the header is only written by flush() and close(). So the first change
+   after a flush sets the header's dirty flag (and writes it to disk before any record changes),
+   and flush() clears it once the records and the count are on disk. Only a heap which was flushed
+   or closed after its last change can be trusted: opening a dirty file (eg. after a crash) raises
+   ValueError, unless 'recover' is True, in which case the records up to the last flushed count are
+   put back in heap order. The recovered heap is valid, but its elements may differ from those of
+   any point in time, since records changed after the flush are kept.
+"""
+
+import os
+
+import numpy as np
+from heap_np import NumericBinaryHeap
+
+MAGIC = int(np.frombuffer(b'HEAPMMAP', dtype='int64')[0])
+VERSION = 2
+HEADER_SIZE = 16
+DTYPES = ['float64', 'int64']
+
+class MemmapNumericHeap(NumericBinaryHeap):
+
+    def __init__(self, path, heap_type=NumericBinaryHeap.MIN_HEAP, dtype='float64', arity=2, capacity=1024, growth_factor=2, recover=False):
+        """ Opens the heap stored at 'path', or creates it with the given settings if the file does not
+        exist. The settings of an existing heap are read from its header. A heap which was not flushed
+        after its last change raises ValueError, unless 'recover' is True (see above). """
+
+        self.path = path
+
+        if not os.path.exists(path):
+            header = np.zeros(HEADER_SIZE, dtype='int64')
+            header[:9] = [MAGIC, VERSION, 0, 0, max(capacity, 1), heap_type, arity, DTYPES.index(np.dtype(dtype).name), 0]
+            with open(path, 'wb') as file:
+                file.write(header.tobytes())
+            os.truncate(path, HEADER_SIZE * 8 + max(capacity, 1) * 2 * 8)
+
+        self.header = np.memmap(path, dtype='int64', mode='r+', shape=(HEADER_SIZE,))
+        if int(self.header[0]) != MAGIC or int(self.header[1]) != VERSION:
+            raise ValueError("%s is not a version %d heap file" % (path, VERSION))
+
+        dtype = DTYPES[int(self.header[7])]
+        super().__init__(int(self.header[5]), dtype, int(self.header[6]), capacity=1, growth_factor=growth_factor)
+
+        self.record_dtype = np.dtype([('priority', dtype), ('offset', 'int64')])
+        self.map_records(int(self.header[4]))
+
+        self.num_elements = int(self.header[2])
+        self.next_index = int(self.header[3])
+        self.dirty = bool(self.header[8])
+
+        if self.dirty:
+            if not recover:
+                raise ValueError("%s was changed and not flushed (open it with recover=True to rebuild it)" % path)
+
+            self.heapify()
+            if self.num_elements > 0:
+                self.next_index = max(self.next_index, int(self.indices[:self.num_elements].max()) + 1)
+            self.flush()
+
+    # Maps the records, with priorities and indices as views of their two fields
+    def map_records(self, capacity):
+        self.records = np.memmap(self.path, dtype=self.record_dtype, mode='r+', offset=HEADER_SIZE * 8, shape=(capacity,))
+        self.priorities = self.records['priority']
+        self.indices = self.records['offset']
+
+    def unmap_records(self):
+        self.records = None
+        self.priorities = None
+        self.indices = None
+
+    def set_capacity(self, capacity):
+        """ Resizes the file to hold 'capacity' records (at least the number of elements in the heap). """
+
+        capacity = max(capacity, self.num_elements, 1)
+
+        # The header is left as it is: if the heap is being changed, it stays dirty
+        self.records.flush()
+        self.unmap_records()
+
+        os.truncate(self.path, HEADER_SIZE * 8 + capacity * self.record_dtype.itemsize)
+        self.header[4] = capacity
+        self.header.flush()
+
+        self.map_records(capacity)
+
+    def flush(self):
+        """ Writes any modified records and then the element count to disk, and clears the dirty flag. """
+
+        if self.records is not None:
+            self.records.flush()
+
+        self.header[2] = self.num_elements
+        self.header[3] = self.next_index
+        self.header[8] = 0
+        self.header.flush()
+        self.dirty = False
+
+    # Sets the dirty flag on disk before the first change to the records after a flush
+    def mark_dirty(self):
+        if not self.dirty:
+            self.header[8] = 1
+            self.header.flush()
+            self.dirty = True
+
+    def close(self):
+        self.flush()
+        self.unmap_records()
+        self.header = None
+
+    def build(self, priorities, indices=None, length=None):
+        """ Replaces the heap's contents with the given priorities (copied into the file), as in NumericBinaryHeap.build(). """
+
+        priorities = np.asarray(priorities, dtype=self.priorities.dtype)
+        if length is None:
+            length = priorities.size
+        if indices is None:
+            indices = np.arange(length, dtype='int64')
+
+        self.mark_dirty()
+        self.num_elements = 0
+        self.ensure_capacity(length)
+
+        self.priorities[:length] = priorities[:length]
+        self.indices[:length] = np.asarray(indices, dtype='int64')[:length]
+        self.num_elements = length
+        if length > 0:
+            self.next_index = max(self.next_index, int(self.indices[:length].max()) + 1)
+
+        self.heapify()
+
+    def add(self, priority, index=None):
+        self.mark_dirty()
+        return super().add(priority, index)
+
+    def push_many(self, priorities, indices=None):
+        self.mark_dirty()
+        return super().push_many(priorities, indices)
+
+    def pop(self):
+        self.mark_dirty()
+        return super().pop()
+
+    def pop_many(self, k):
+        self.mark_dirty()
+        return super().pop_many(k)
\ No newline at end of file
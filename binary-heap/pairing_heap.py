@@ -0,0 +1,212 @@
+""" Implementation of a pairing heap
+   A mergeable heap with the same add()/pop()/is_empty() surface as BinaryHeap in heap.py, and
+   the same ordering modes (compare(), native=True or a cached key=function).
+
+   The heap is a tree in which every node has a higher priority than its children. Each node
+   keeps its leftmost child, its next sibling and its previous sibling (or its parent, for a
+   leftmost child), so that a node can be cut out of the tree in O(1).
+     add(), meld(): O(1) - the new root is the higher of the two roots
+     pop(): O(log n) amortized - the children of the root are linked in pairs, left to right,
+       then the pairs are linked right to left
+     decrease_key() / increase_key(): O(log n) amortized. add() returns the element's node, which
+       is used as its handle.
+"""
+
+from heap import BinaryHeap, priority_function
+
+class PairingNode:
+
+    def __init__(self, value, priority):
+        self.value = value
+        self.priority = priority
+
+        self.child = None
+        self.sibling = None
+
+        # Previous sibling, or the parent if this node is the leftmost child
+        self.previous = None
+
+    def get_value(self):
+        return self.value
+
+class PairingHeap:
+
+    MIN_HEAP = BinaryHeap.MIN_HEAP
+    MAX_HEAP = BinaryHeap.MAX_HEAP
+
+    def __init__(self, heap_type, key=None, native=False):
+        self.root = None
+        self.num_elements = 0
+        self.heap_type = heap_type
+        self.key = key
+
+        # higher(x, y) is True if priority x belongs above priority y
+        self.higher = priority_function(heap_type, native or key is not None)
+
+    def get_length(self):
+        return self.num_elements
+
+    def is_empty(self):
+        if self.root is None:
+            return True
+        else:
+            return False
+
+    # Returns the top element without removing it, or None if the heap is empty
+    def peek(self):
+        if self.root is None:
+            return None
+        else:
+            return self.root.value
+
+    # Returns True if the node of a handle is in the heap
+    def contains(self, node):
+        if node is self.root or node.previous is not None:
+            return True
+        else:
+            return False
+
+    def add(self, value):
+        """ Adds a value and returns its node, which is the handle used by decrease_key(), increase_key() and remove(). """
+
+        node = PairingNode(value, value if self.key is None else self.key(value))
+        self.root = self.link(self.root, node)
+        self.num_elements = self.num_elements + 1
+
+        return node
+
+    def pop(self):
+        if self.root is None:
+            return None
+
+        root = self.root
+        self.root = self.merge_pairs(root.child)
+        root.child = None
+        self.num_elements = self.num_elements - 1
+
+        return root.value
+
+    def meld(self, other):
+        """ Moves every element of 'other', a pairing heap of the same type and ordering, into this heap in O(1). """
+
+        self.root = self.link(self.root, other.root)
+        self.num_elements = self.num_elements + other.num_elements
+
+        other.root = None
+        other.num_elements = 0
+
+    def decrease_key(self, node, value):
+        """ Replaces the element of a node with 'value', which must not be bigger than the current
+        element. Returns False if the node is not in the heap or 'value' is bigger. """
+        return self.change_key(node, value, True)
+
+    def increase_key(self, node, value):
+        """ Replaces the element of a node with 'value', which must not be smaller than the current
+        element. Returns False if the node is not in the heap or 'value' is smaller. """
+        return self.change_key(node, value, False)
+
+    def change_key(self, node, value, decrease):
+        if not self.contains(node):
+            return False
+
+        priority = value if self.key is None else self.key(value)
+
+        # Decreasing raises an element's priority in a min heap, and lowers it in a max heap
+        raise_priority = (self.heap_type == PairingHeap.MIN_HEAP) == decrease
+
+        if raise_priority and self.higher(node.priority, priority):
+            return False
+        if not raise_priority and self.higher(priority, node.priority):
+            return False
+
+        if raise_priority:
+
+            # The node's subtree is still ordered, so it is cut out and linked with the root
+            node.value = value
+            node.priority = priority
+            if node is not self.root:
+                self.cut(node)
+                self.root = self.link(self.root, node)
+        else:
+
+            # The node may now belong below its children, so it is removed and added again
+            self.remove(node)
+            node.value = value
+            node.priority = priority
+            self.root = self.link(self.root, node)
+            self.num_elements = self.num_elements + 1
+
+        return True
+
+    # Removes the node of a handle, returning its element (or None if the node is not in the heap)
+    def remove(self, node):
+        if not self.contains(node):
+            return None
+
+        if node is self.root:
+            return self.pop()
+
+        self.cut(node)
+        self.root = self.link(self.root, self.merge_pairs(node.child))
+        node.child = None
+        self.num_elements = self.num_elements - 1
+
+        return node.value
+
+    # Detaches a (non-root) node and its subtree from the tree
+    def cut(self, node):
+        if node.previous.child is node:
+            node.previous.child = node.sibling
+        else:
+            node.previous.sibling = node.sibling
+
+        if node.sibling is not None:
+            node.sibling.previous = node.previous
+
+        node.previous = None
+        node.sibling = None
+
+    # Links two trees, making the root with the lower priority the leftmost child of the other
+    def link(self, first, second):
+        if first is None:
+            return second
+        if second is None:
+            return first
+
+        if self.higher(second.priority, first.priority):
+            first, second = second, first
+
+        second.sibling = first.child
+        if first.child is not None:
+            first.child.previous = second
+        second.previous = first
+        first.child = second
+
+        return first
+
+    # Links a list of siblings into one tree (two-pass pairing)
+    def merge_pairs(self, node):
+        if node is None:
+            return None
+
+        # First pass: link the siblings in pairs, left to right
+        pairs = []
+        while node is not None:
+            first = node
+            second = node.sibling
+            node = None if second is None else second.sibling
+
+            first.previous = None
+            first.sibling = None
+            if second is not None:
+                second.previous = None
+                second.sibling = None
+
+            pairs.append(self.link(first, second))
+
+        # Second pass: link the pairs right to left
+        tree = pairs.pop()
+        while len(pairs) > 0:
+            tree = self.link(pairs.pop(), tree)
+
+        return tree
\ No newline at end of file
@@ -0,0 +1,208 @@
+""" Thread-safe and asyncio priority queues backed by BinaryHeap
+   PriorityQueue: a blocking queue for threads. put() and get() can block, with an optional
+   timeout, and raise queue.Full / queue.Empty like the standard library's queues. If 'maxsize' is
+   set, put() blocks while the queue is full, which applies backpressure to producers.
+
+   AsyncPriorityQueue: a queue for coroutines, with awaitable put() and get() (use
+   asyncio.wait_for() for timeouts). Producers running in other threads can add elements with
+   put_threadsafe(), which blocks the calling thread while the queue is full. The queue must know
+   its event loop by then: it is the running loop when the queue is created, the 'loop' argument,
+   or the loop of the latest put() or get() call.
+
+   Elements are ordered as in heap.py: with compare(), natively (native=True) or by a cached key
+   (key=function). The top element (smallest in a MIN_HEAP queue) is returned first.
+"""
+
+import asyncio
+import collections
+import queue
+import threading
+import time
+
+from heap import BinaryHeap
+
+class PriorityQueue:
+
+    def __init__(self, heap_type=BinaryHeap.MIN_HEAP, maxsize=0, key=None, native=False, arity=2):
+        self.heap = BinaryHeap(heap_type, key, native, arity)
+        self.maxsize = maxsize
+
+        # Both conditions share one lock, so producers and consumers only wake each other
+        self.mutex = threading.Lock()
+        self.not_empty = threading.Condition(self.mutex)
+        self.not_full = threading.Condition(self.mutex)
+
+    def qsize(self):
+        with self.mutex:
+            return len(self.heap.get_array())
+
+    def empty(self):
+        with self.mutex:
+            return self.heap.is_empty()
+
+    def full(self):
+        with self.mutex:
+            return self.is_full()
+
+    # Must be called with the lock held
+    def is_full(self):
+        if self.maxsize > 0 and len(self.heap.get_array()) >= self.maxsize:
+            return True
+        else:
+            return False
+
+    def put(self, value, block=True, timeout=None):
+        """ Adds a value. If the queue is full, waits for room (at most 'timeout' seconds, if given)
+        unless 'block' is False, then raises queue.Full. """
+
+        with self.not_full:
+            self.wait_for(self.not_full, self.is_full, block, timeout, queue.Full)
+            self.heap.add(value)
+            self.not_empty.notify()
+
+    def get(self, block=True, timeout=None):
+        """ Removes and returns the top element. If the queue is empty, waits for an element (at most
+        'timeout' seconds, if given) unless 'block' is False, then raises queue.Empty. """
+
+        with self.not_empty:
+            self.wait_for(self.not_empty, self.heap.is_empty, block, timeout, queue.Empty)
+            value = self.heap.pop()
+            self.not_full.notify()
+            return value
+
+    def put_nowait(self, value):
+        self.put(value, False)
+
+    def get_nowait(self):
+        return self.get(False)
+
+    # Waits on a condition while 'waiting()' is True, raising 'error' if it does not become False in time
+    def wait_for(self, condition, waiting, block, timeout, error):
+        if not block:
+            if waiting():
+                raise error
+        elif timeout is None:
+            while waiting():
+                condition.wait()
+        else:
+            deadline = time.monotonic() + timeout
+            while waiting():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise error
+                condition.wait(remaining)
+
+class AsyncPriorityQueue:
+
+    def __init__(self, heap_type=BinaryHeap.MIN_HEAP, maxsize=0, key=None, native=False, arity=2, loop=None):
+        self.heap = BinaryHeap(heap_type, key, native, arity)
+        self.maxsize = maxsize
+
+        # Futures of the coroutines waiting for an element or for room
+        self.getters = collections.deque()
+        self.putters = collections.deque()
+
+        # Event loop which owns the queue, used by put_threadsafe(): by default the running loop, or
+        # else the loop of the first put() or get() (each call binds the loop it runs in)
+        if loop is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+        self.loop = loop
+
+    def qsize(self):
+        return len(self.heap.get_array())
+
+    def empty(self):
+        return self.heap.is_empty()
+
+    def full(self):
+        if self.maxsize > 0 and len(self.heap.get_array()) >= self.maxsize:
+            return True
+        else:
+            return False
+
+    async def put(self, value):
+        """ Adds a value, waiting for room if the queue is full. """
+
+        self.loop = asyncio.get_running_loop()
+        while self.full():
+            putter = self.create_waiter(self.putters)
+            try:
+                await putter
+            except:
+                putter.cancel()
+                self.discard_waiter(self.putters, putter)
+
+                # Pass the wake-up on if this coroutine was woken but will not add anything
+                if not self.full():
+                    self.wake_next(self.putters)
+                raise
+
+        self.put_nowait(value)
+
+    async def get(self):
+        """ Removes and returns the top element, waiting for one if the queue is empty. """
+
+        self.loop = asyncio.get_running_loop()
+        while self.empty():
+            getter = self.create_waiter(self.getters)
+            try:
+                await getter
+            except:
+                getter.cancel()
+                self.discard_waiter(self.getters, getter)
+
+                # Pass the wake-up on if this coroutine was woken but will not remove anything
+                if not self.empty():
+                    self.wake_next(self.getters)
+                raise
+
+        return self.get_nowait()
+
+    def put_nowait(self, value):
+        if self.full():
+            raise asyncio.QueueFull
+
+        self.heap.add(value)
+        self.wake_next(self.getters)
+
+    def get_nowait(self):
+        if self.empty():
+            raise asyncio.QueueEmpty
+
+        value = self.heap.pop()
+        self.wake_next(self.putters)
+        return value
+
+    def put_threadsafe(self, value, timeout=None):
+        """ Adds a value from a thread other than the event loop's, blocking the calling thread until
+        the value has been added (at most 'timeout' seconds, if given). Raises RuntimeError if the
+        queue's event loop is not known yet: the queue must have been created in the running loop,
+        been given 'loop', or have been used by put() or get() in the loop. """
+
+        if self.loop is None:
+            raise RuntimeError("the queue has no event loop yet: create it in the running loop, pass 'loop', or call get()/put() in the loop first")
+
+        future = asyncio.run_coroutine_threadsafe(self.put(value), self.loop)
+        future.result(timeout)
+
+    def create_waiter(self, waiters):
+        waiter = self.loop.create_future()
+        waiters.append(waiter)
+        return waiter
+
+    def discard_waiter(self, waiters, waiter):
+        try:
+            waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    # Wakes the longest-waiting coroutine which is still waiting
+    def wake_next(self, waiters):
+        while len(waiters) > 0:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
\ No newline at end of file
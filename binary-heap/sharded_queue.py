@@ -0,0 +1,109 @@
+""" Implementation of a sharded concurrent priority queue
+   The queue is split into 'num_shards' independent BinaryHeaps, each with its own lock, so
+   threads adding and removing elements rarely wait for one another.
+
+   add() puts an element into a random shard. pop() has two modes:
+     relaxed (default): looks at the tops of two random shards and pops the better of them, so
+       the element returned is near, but not always at, the top of the whole queue
+     strict: locks every shard and pops the top of the whole queue, like a single heap
+
+   Elements are ordered as in heap.py: with compare(), natively (native=True) or by a cached key
+   (key=function).
+"""
+
+import random
+import threading
+
+from heap import BinaryHeap
+
+class ShardedPriorityQueue:
+
+    def __init__(self, num_shards, heap_type=BinaryHeap.MIN_HEAP, key=None, native=False, strict=False):
+        self.heaps = [BinaryHeap(heap_type, key, native) for shard in range(num_shards)]
+        self.locks = [threading.Lock() for shard in range(num_shards)]
+        self.strict = strict
+
+        self.higher = self.heaps[0].higher
+
+    def get_length(self):
+        length = 0
+        for shard in range(len(self.heaps)):
+            with self.locks[shard]:
+                length = length + len(self.heaps[shard].get_array())
+        return length
+
+    def is_empty(self):
+        for shard in range(len(self.heaps)):
+            with self.locks[shard]:
+                if not self.heaps[shard].is_empty():
+                    return False
+        return True
+
+    def add(self, value):
+        shard = random.randrange(len(self.heaps))
+        with self.locks[shard]:
+            self.heaps[shard].add(value)
+
+    def pop(self):
+        """ Removes and returns an element (see the strict and relaxed modes above), or returns None if the queue is empty. """
+
+        if self.strict:
+            return self.pop_strict()
+        else:
+            return self.pop_relaxed()
+
+    def pop_strict(self):
+
+        # Locks are always taken in shard order, so two strict pops cannot deadlock
+        for lock in self.locks:
+            lock.acquire()
+        try:
+            best = None
+            for shard in range(len(self.heaps)):
+                heap = self.heaps[shard]
+                if not heap.is_empty() and (best is None or self.higher(heap.get_priority(0), self.heaps[best].get_priority(0))):
+                    best = shard
+
+            if best is None:
+                return None
+            else:
+                return self.heaps[best].pop()
+        finally:
+            for lock in self.locks:
+                lock.release()
+
+    def pop_relaxed(self):
+        num_shards = len(self.heaps)
+
+        if num_shards > 1:
+            first, second = random.sample(range(num_shards), 2)
+            first_top = self.peek_shard(first)
+            second_top = self.peek_shard(second)
+
+            # Pop from the better of the two shards (their tops may have changed since, which the relaxed order allows)
+            if first_top is not None or second_top is not None:
+                if first_top is None or (second_top is not None and self.higher(second_top[0], first_top[0])):
+                    shard = second
+                else:
+                    shard = first
+
+                with self.locks[shard]:
+                    if not self.heaps[shard].is_empty():
+                        return self.heaps[shard].pop()
+
+        # Both shards were empty: take the top of the first shard which is not
+        for shard in range(num_shards):
+            with self.locks[shard]:
+                if not self.heaps[shard].is_empty():
+                    return self.heaps[shard].pop()
+
+        return None
+
+    # Returns the top priority of a shard as a 1-tuple, or None if the shard is empty
+    def peek_shard(self, shard):
+        with self.locks[shard]:
+            heap = self.heaps[shard]
+            if heap.is_empty():
+                return None
+            else:
+                return (heap.get_priority(0),)
\ No newline at end of file
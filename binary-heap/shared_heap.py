@@ -0,0 +1,204 @@
+""" Implementation of a numeric heap in shared memory
+   SharedNumericHeap is a NumericBinaryHeap (heap_np.py) whose arrays live in a
+   multiprocessing.shared_memory block, so several processes can add and pop priorities without
+   pickling them or funnelling them through a manager process. Every operation holds a
+   cross-process lock.
+
+   The block starts with a header, followed by the priority array and the index array:
+     header: int64[8] = num_elements, next_index, capacity, heap_type, arity, dtype code, unused, unused
+   The capacity is fixed when the heap is created; adding beyond it raises OverflowError.
+
+   Usage:
+     heap = SharedNumericHeap.create(capacity)                # in the parent process
+     Process(target=worker, args=(heap,)).start()             # the heap is re-attached in the child
+     Pool(n, initializer=init_worker, initargs=(heap,))       # pool tasks then call get_worker_heap()
+     heap = SharedNumericHeap.attach(name, lock)              # or attach explicitly by name
+   The creating process should call unlink() once every process has called close().
+
+   Like the lock it holds, the heap can only be handed to a process when the process is started.
+   It cannot be passed as an argument to a Pool task (eg. pool.map(work, [heap])), since task
+   arguments are pickled after the workers have started, so a pool's workers receive it through
+   the pool's initializer instead.
+"""
+
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+from heap_np import NumericBinaryHeap
+
+HEADER_SIZE = 8
+DTYPES = ['float64', 'int64']
+
+class SharedNumericHeap(NumericBinaryHeap):
+
+    def __init__(self, memory, lock):
+        header = np.ndarray(HEADER_SIZE, dtype='int64', buffer=memory.buf)
+        capacity = int(header[2])
+
+        super().__init__(int(header[3]), DTYPES[int(header[5])], int(header[4]), capacity=1)
+
+        self.memory = memory
+        self.lock = lock
+        self.header = header
+
+        offset = HEADER_SIZE * 8
+        self.priorities = np.ndarray(capacity, dtype=DTYPES[int(header[5])], buffer=memory.buf, offset=offset)
+        self.indices = np.ndarray(capacity, dtype='int64', buffer=memory.buf, offset=offset + capacity * 8)
+        self.min_capacity = capacity
+
+        self.load()
+
+    @classmethod
+    def create(cls, capacity, heap_type=NumericBinaryHeap.MIN_HEAP, dtype='float64', arity=2, lock=None, name=None):
+        """ Creates a heap with room for 'capacity' elements in a new shared memory block. """
+
+        memory = shared_memory.SharedMemory(name=name, create=True, size=(HEADER_SIZE + 2 * capacity) * 8)
+
+        header = np.ndarray(HEADER_SIZE, dtype='int64', buffer=memory.buf)
+        header[:] = [0, 0, capacity, heap_type, arity, DTYPES.index(np.dtype(dtype).name), 0, 0]
+        del header
+
+        # Reentrant, since some operations are built from others (eg. pop_many() from pop())
+        if lock is None:
+            lock = multiprocessing.RLock()
+
+        return cls(memory, lock)
+
+    @classmethod
+    def attach(cls, name, lock):
+        """ Attaches to the heap in an existing shared memory block. 'lock' must be the heap's (reentrant) lock. """
+        return cls(shared_memory.SharedMemory(name=name), lock)
+
+    def get_name(self):
+        return self.memory.name
+
+    # Processes started with the heap as an argument re-attach to the same block and lock
+    def __getstate__(self):
+        multiprocessing.context.assert_spawning(self)
+        return {"name" : self.memory.name, "lock" : self.lock}
+
+    def __setstate__(self, state):
+        self.__init__(shared_memory.SharedMemory(name=state["name"]), state["lock"])
+
+    # Detaches this process from the heap
+    def close(self):
+        self.priorities = None
+        self.indices = None
+        self.header = None
+        self.memory.close()
+
+    # Destroys the shared memory block (called once, by the creating process)
+    def unlink(self):
+        self.memory.unlink()
+
+    # The element count and next index are shared, so they are read before and written after each operation
+    def load(self):
+        self.num_elements = int(self.header[0])
+        self.next_index = int(self.header[1])
+
+    def store(self):
+        self.header[0] = self.num_elements
+        self.header[1] = self.next_index
+
+    def set_capacity(self, capacity):
+        if capacity > self.priorities.size:
+            raise OverflowError("shared heap capacity of %d elements exceeded" % self.priorities.size)
+
+    def get_length(self):
+        with self.lock:
+            self.load()
+            return self.num_elements
+
+    def is_empty(self):
+        if self.get_length() == 0:
+            return True
+        else:
+            return False
+
+    def build(self, priorities, indices=None, length=None):
+        """ Replaces the heap's contents with the given priorities (copied into shared memory), as in NumericBinaryHeap.build(). """
+
+        priorities = np.asarray(priorities, dtype=self.priorities.dtype)
+        if length is None:
+            length = priorities.size
+        if indices is None:
+            indices = np.arange(length, dtype='int64')
+
+        with self.lock:
+            self.load()
+            self.ensure_capacity(length)
+            self.priorities[:length] = priorities[:length]
+            self.indices[:length] = np.asarray(indices, dtype='int64')[:length]
+            self.num_elements = length
+            if length > 0:
+                self.next_index = max(self.next_index, int(self.indices[:length].max()) + 1)
+            self.heapify()
+            self.store()
+
+    # add() and push_many() advance next_index before checking the capacity, so a failed call puts it back
+    def add(self, priority, index=None):
+        with self.lock:
+            self.load()
+            try:
+                return super().add(priority, index)
+            except:
+                self.next_index = int(self.header[1])
+                raise
+            finally:
+                self.store()
+
+    def push_many(self, priorities, indices=None):
+        with self.lock:
+            self.load()
+            try:
+                return super().push_many(priorities, indices)
+            except:
+                self.next_index = int(self.header[1])
+                raise
+            finally:
+                self.store()
+
+    def pop(self):
+        with self.lock:
+            self.load()
+            try:
+                return super().pop()
+            finally:
+                self.store()
+
+    def pop_many(self, k):
+        with self.lock:
+            self.load()
+            try:
+                return super().pop_many(k)
+            finally:
+                self.store()
+
+    def peek(self):
+        with self.lock:
+            self.load()
+            return super().peek()
+
+    def nsmallest(self, k):
+        with self.lock:
+            self.load()
+            return super().nsmallest(k)
+
+    def nlargest(self, k):
+        with self.lock:
+            self.load()
+            return super().nlargest(k)
+
+# The heap of a Pool worker process, set by the pool's initializer
+worker_heap = None
+
+def init_worker(heap):
+    """ Pool initializer: Pool(n, initializer=init_worker, initargs=(heap,)) hands 'heap' to every worker. """
+
+    global worker_heap
+    worker_heap = heap
+
+def get_worker_heap():
+    """ Returns the heap given to this Pool worker process by init_worker(). """
+    return worker_heap
\ No newline at end of file
@@ -0,0 +1,128 @@
+""" Implementation of a timer queue with lazy cancellation
+   schedule() adds a timer to a BinaryHeap ordered by deadline (timers with equal deadlines fire in
+   the order they were scheduled), and returns the Timer as its handle.
+
+   cancel() runs in O(1): it only marks the timer as cancelled, leaving a tombstone in the heap.
+   Tombstones are skipped (and dropped) when they reach the top of the heap, and once they make
+   up more than 'compaction_ratio' of the heap, the heap is rebuilt from the live timers. Since a
+   rebuild costs O(n) and follows at least 'compaction_ratio' * n cancellations, cancelling stays
+   O(1) amortized, and the heap never grows much beyond the number of live timers.
+"""
+
+from heap import BinaryHeap
+
+class Timer:
+
+    def __init__(self, deadline, sequence, value):
+        self.deadline = deadline
+        self.sequence = sequence
+        self.value = value
+
+        # A timer is active until it is cancelled or popped
+        self.active = True
+        self.cancelled = False
+
+    def get_deadline(self):
+        return self.deadline
+
+    def get_value(self):
+        return self.value
+
+    def is_active(self):
+        return self.active
+
+    def is_cancelled(self):
+        return self.cancelled
+
+class TimerQueue:
+
+    # Heaps smaller than this are not worth compacting
+    MIN_COMPACTION_SIZE = 64
+
+    def __init__(self, compaction_ratio=0.5, arity=2):
+        self.compaction_ratio = compaction_ratio
+        self.arity = arity
+
+        self.heap = self.create_heap()
+        self.next_sequence = 0
+        self.num_cancelled = 0
+
+    def create_heap(self):
+        return BinaryHeap(BinaryHeap.MIN_HEAP, key=lambda timer: (timer.deadline, timer.sequence), arity=self.arity)
+
+    # Number of active timers
+    def get_length(self):
+        return len(self.heap.get_array()) - self.num_cancelled
+
+    def is_empty(self):
+        if self.get_length() == 0:
+            return True
+        else:
+            return False
+
+    def schedule(self, deadline, value=None):
+        """ Adds a timer which fires at 'deadline', holding 'value', and returns it. """
+
+        timer = Timer(deadline, self.next_sequence, value)
+        self.next_sequence = self.next_sequence + 1
+        self.heap.add(timer)
+
+        return timer
+
+    def cancel(self, timer):
+        """ Cancels an active timer. Returns False if the timer was already cancelled or popped. """
+
+        if not timer.active:
+            return False
+
+        timer.active = False
+        timer.cancelled = True
+        self.num_cancelled = self.num_cancelled + 1
+
+        size = len(self.heap.get_array())
+        if size >= TimerQueue.MIN_COMPACTION_SIZE and self.num_cancelled > size * self.compaction_ratio:
+            self.compact()
+
+        return True
+
+    def compact(self):
+        """ Rebuilds the heap from the active timers, dropping every tombstone. """
+
+        live = [timer for timer in self.heap.get_array() if not timer.cancelled]
+
+        self.heap = self.create_heap()
+        self.heap.build(live)
+        self.num_cancelled = 0
+
+    # Returns the active timer with the earliest deadline without removing it, or None if there is none
+    def peek(self):
+        self.drop_cancelled()
+        return self.heap.peek()
+
+    def pop(self):
+        """ Removes and returns the active timer with the earliest deadline, or returns None if there is none. """
+
+        self.drop_cancelled()
+        timer = self.heap.pop()
+        if timer is not None:
+            timer.active = False
+
+        return timer
+
+    def pop_expired(self, now):
+        """ Removes and returns every active timer whose deadline is at or before 'now', earliest first. """
+
+        expired = []
+        timer = self.peek()
+        while timer is not None and timer.deadline <= now:
+            expired.append(self.pop())
+            timer = self.peek()
+
+        return expired
+
+    # Pops the tombstones from the top of the heap
+    def drop_cancelled(self):
+        heap = self.heap
+        while not heap.is_empty() and heap.get_array()[0].cancelled:
+            heap.pop()
+            self.num_cancelled = self.num_cancelled - 1
\ No newline at end of file
@@ -0,0 +1,390 @@
+""" Compressed sparse row (CSR) form of a Graph
+   A CSRGraph is a frozen copy of a Graph in three NumPy arrays. Vertex ids are interned as dense
+   indices 0..V-1 (vertex_ids[index] is the id of a vertex, vertex_index[id] is its index), and
+   the edges from the vertex with index i are:
+     indices[indptr[i]:indptr[i + 1]]    the indices of their destinations
+     weights[indptr[i]:indptr[i + 1]]    their weights
+   This takes 16 bytes per edge (int64 index, float64 weight) instead of a dictionary entry per edge,
+   and the edges of a vertex are adjacent in memory.
+
+   dijkstra() and prim() work on indices and return arrays indexed by vertex index:
+     distances, previous = csr.dijkstra(vertex)
+     parent, weights = csr.prim()
+   get_entry_dict() and get_tree() convert their results into the outputs of Graph.dijkstra() and
+   Graph.prim().
+"""
+
+import multiprocessing
+import os
+from array import array
+
+import numpy as np
+
+from graph import Graph
+from heap import BinaryHeap
+
+class CSRGraph:
+
+    def __init__(self, vertex_ids, indptr, indices, weights):
+        self.vertex_ids = list(vertex_ids)
+        self.vertex_index = {vertex : index for index, vertex in enumerate(self.vertex_ids)}
+
+        self.indptr = np.asarray(indptr, dtype='int64')
+        self.indices = np.asarray(indices, dtype='int64')
+        self.weights = np.asarray(weights, dtype='float64')
+
+    @classmethod
+    def from_graph(cls, graph):
+        """ Makes a CSRGraph of a Graph. Edges to vertices which have been removed are left out. """
+
+        adjacency = graph.graph
+        vertex_ids = list(adjacency.keys())
+        vertex_index = {vertex : index for index, vertex in enumerate(vertex_ids)}
+
+        counts = np.fromiter((sum(1 for j in adjacency[i] if j in vertex_index) for i in vertex_ids),
+                             dtype='int64', count=len(vertex_ids))
+        indptr = np.zeros(len(vertex_ids) + 1, dtype='int64')
+        np.cumsum(counts, out=indptr[1:])
+        num_edges = int(indptr[-1])
+
+        indices = np.fromiter((vertex_index[j] for i in vertex_ids for j in adjacency[i] if j in vertex_index),
+                              dtype='int64', count=num_edges)
+        weights = np.fromiter((weight for i in vertex_ids for j, weight in adjacency[i].items() if j in vertex_index),
+                              dtype='float64', count=num_edges)
+
+        return cls(vertex_ids, indptr, indices, weights)
+
+    @classmethod
+    def from_edges(cls, edges):
+        """ Makes a CSRGraph of (vertex_from, vertex_to, weight) edges, without making a Graph first.
+        Vertices are indexed in the order they first appear. As in Graph.add_edges(), only the first of
+        repeated edges (with the same vertex_from and vertex_to) is kept. """
+
+        vertex_index = {}
+        sources = array('q')
+        dests = array('q')
+        weights = array('d')
+
+        for vertex_from, vertex_to, weight in edges:
+            i = vertex_index.get(vertex_from)
+            if i is None:
+                i = vertex_index[vertex_from] = len(vertex_index)
+            j = vertex_index.get(vertex_to)
+            if j is None:
+                j = vertex_index[vertex_to] = len(vertex_index)
+
+            sources.append(i)
+            dests.append(j)
+            weights.append(weight)
+
+        return cls.from_indexed_edges(list(vertex_index.keys()), np.frombuffer(sources, dtype='int64'),
+                                      np.frombuffer(dests, dtype='int64'), np.frombuffer(weights, dtype='float64'))
+
+    @classmethod
+    def from_edge_arrays(cls, sources, dests, weights):
+        """ Makes a CSRGraph of edges given as arrays of vertex ids and weights. Vertices are indexed in
+        sorted order of their ids. Only the first of repeated edges is kept. """
+
+        sources = np.asarray(sources)
+        vertex_ids, inverse = np.unique(np.concatenate((sources, np.asarray(dests))), return_inverse=True)
+
+        return cls.from_indexed_edges(vertex_ids.tolist(), inverse[:sources.size], inverse[sources.size:], weights)
+
+    @classmethod
+    def from_indexed_edges(cls, vertex_ids, sources, dests, weights):
+        """ Makes a CSRGraph of edges given as arrays of vertex indices and weights, in any order. Only the
+        first of repeated edges is kept, as in Graph.add_edges(). """
+
+        sources = np.asarray(sources, dtype='int64')
+        dests = np.asarray(dests, dtype='int64')
+        weights = np.asarray(weights, dtype='float64')
+
+        # np.unique() returns the position of the first occurrence of each (source, dest) pair
+        first = np.unique(sources * len(vertex_ids) + dests, return_index=True)[1]
+        if first.size < sources.size:
+            first.sort()
+            sources = sources[first]
+            dests = dests[first]
+            weights = weights[first]
+
+        # A stable sort keeps the edges of each vertex in the order they were given
+        order = np.argsort(sources, kind='stable')
+        indptr = np.zeros(len(vertex_ids) + 1, dtype='int64')
+        np.cumsum(np.bincount(sources, minlength=len(vertex_ids)), out=indptr[1:])
+
+        return cls(vertex_ids, indptr, dests[order], weights[order])
+
+    def to_graph(self):
+        """ Makes a Graph of the CSRGraph. Weights are returned as floats. """
+
+        graph = Graph()
+        vertex_ids = self.vertex_ids
+        indptr = self.indptr.tolist()
+        indices = self.indices.tolist()
+        weights = self.weights.tolist()
+
+        for i in range(len(vertex_ids)):
+            graph.graph[vertex_ids[i]] = {vertex_ids[indices[k]] : weights[k] for k in range(indptr[i], indptr[i + 1])}
+
+        return graph
+
+    def get_num_vertices(self):
+        return len(self.vertex_ids)
+
+    def get_num_edges(self):
+        return int(self.indptr[-1])
+
+    # Returns the index of a vertex id, or None if there is no such vertex
+    def get_index(self, vertex):
+        return self.vertex_index.get(vertex)
+
+    def get_vertex(self, index):
+        return self.vertex_ids[index]
+
+    # Returns the destination indices and weights of the edges from the vertex with index 'index'
+    def get_edges(self, index):
+        start = self.indptr[index]
+        end = self.indptr[index + 1]
+        return self.indices[start:end], self.weights[start:end]
+
+    """
+    ALGORITHMS
+    The loops run over Python lists taken from the arrays, since indexing a NumPy array one element at
+    a time is slower than indexing a list. prim() visits every edge, so it converts whole arrays, while
+    Dijkstra's algorithm converts the edges of each vertex as it processes it.
+    """
+
+    """
+    Dijkstra's Algorithm - Shortest path (from a vertex)
+
+    As in Graph.dijkstra(), with (distance, index) tuples in the heap. Returns two arrays indexed by
+    vertex index: the total distance of each vertex (inf if unreachable) and the index of the
+    previous vertex on its shortest path (-1 for the starting vertex and unreachable vertices).
+    Returns None if 'vertex' is not in the graph.
+    """
+
+    def dijkstra(self, vertex, target=None):
+        source = self.get_index(vertex)
+        if source is None:
+            return None
+        if target is not None:
+            target = self.get_index(target)
+
+        distances, previous, nearest = self.search([source], target)
+        return distances, previous
+
+    """
+    Multi-source Dijkstra's Algorithm - Nearest source (from several vertices)
+
+    A single search which starts from every source at once, so each vertex is reached from its
+    nearest source (eg. the nearest facility to every customer) in the time of one dijkstra() call.
+    Returns three arrays indexed by vertex index: the distance to the nearest source, the previous
+    vertex on the path from it, and the index of the nearest source (-1 if no source can reach the
+    vertex). Returns None if any source is not in the graph.
+    """
+
+    def multi_source_dijkstra(self, sources):
+        indices = [self.get_index(vertex) for vertex in sources]
+        if None in indices:
+            return None
+
+        return self.search(indices, None)
+
+    # Dijkstra's algorithm from the vertices with indices 'sources'. Only the edges of the vertices it
+    # processes are read from the arrays, and its tables are dictionaries, so a search which stops
+    # early at 'target' costs little more than the vertices it explored (filling the returned arrays
+    # is a single O(V) pass in NumPy). Nothing is copied from the arrays up front, so processes which
+    # share them (see dijkstra_many()) never make copies of the whole graph.
+    def search(self, sources, target):
+        indptr, indices, weights = self.indptr, self.indices, self.weights
+
+        distances = {}
+        previous = {}
+        nearest = {}
+        processed = set()
+
+        vertex_heap = BinaryHeap(BinaryHeap.MIN_HEAP, native=True)
+        for source in sources:
+            distances[source] = 0.0
+            nearest[source] = source
+            vertex_heap.add((0.0, source))
+
+        while not vertex_heap.is_empty():
+            current_distance, current = vertex_heap.pop()
+
+            # An older entry of a vertex that has already been processed
+            if current in processed:
+                continue
+            processed.add(current)
+
+            if current == target:
+                break
+
+            start = indptr[current]
+            end = indptr[current + 1]
+            neighbours = indices[start:end].tolist()
+            edge_weights = weights[start:end].tolist()
+
+            for i, weight in zip(neighbours, edge_weights):
+                distance = current_distance + weight
+                if distance < distances.get(i, float('inf')):
+                    distances[i] = distance
+                    previous[i] = current
+                    nearest[i] = nearest[current]
+                    vertex_heap.add((distance, i))
+
+        num_vertices = len(self.vertex_ids)
+        return (to_array(distances, num_vertices, np.inf, 'float64'), to_array(previous, num_vertices, -1, 'int64'),
+                to_array(nearest, num_vertices, -1, 'int64'))
+
+    """
+    Dijkstra's Algorithm from many sources, in parallel
+
+    Yields (source, distances, previous) for every source, as dijkstra() would return them, as soon
+    as each search finishes (not necessarily in the order of 'sources'). The searches are run by a
+    pool of 'workers' processes (by default one per CPU). The processes are forked, so they share
+    the graph's arrays with this process instead of receiving a copy; where processes cannot be
+    forked, or 'workers' is 1, the searches run in this process. Sources which are not in the graph
+    are yielded as (source, None, None).
+    """
+
+    def dijkstra_many(self, sources, workers=None, chunk_size=1):
+        indices = []
+        for vertex in sources:
+            index = self.get_index(vertex)
+            if index is None:
+                yield vertex, None, None
+            else:
+                indices.append(index)
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if workers == 1 or len(indices) <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+            for index in indices:
+                distances, previous, nearest = self.search([index], None)
+                yield self.vertex_ids[index], distances, previous
+            return
+
+        # Forked processes are handed the graph itself, not a pickled copy: its arrays are inherited
+        # memory, and as the searches only read them, the pages stay shared with this process
+        pool = multiprocessing.get_context('fork').Pool(min(workers, len(indices)), initializer=start_worker, initargs=(self,))
+
+        with pool:
+            for index, distances, previous in pool.imap_unordered(dijkstra_worker, indices, chunk_size):
+                yield self.vertex_ids[index], distances, previous
+
+    def get_entry_dict(self, distances, previous, nearest=None):
+        """ Converts the arrays returned by dijkstra() into the table returned by Graph.dijkstra(). If the
+        'nearest' array of multi_source_dijkstra() is given, each entry also has the nearest "source". """
+
+        vertex_ids = self.vertex_ids
+        entry_dict = {}
+
+        for i, (distance, j) in enumerate(zip(distances.tolist(), previous.tolist())):
+            if distance == float('inf'):
+                entry_dict[vertex_ids[i]] = { "previous" : "", "total_distance" : Graph.BIG_NUMBER }
+            else:
+                entry_dict[vertex_ids[i]] = { "previous" : vertex_ids[j] if j >= 0 else "", "total_distance" : distance }
+
+        if nearest is not None:
+            for i, j in enumerate(nearest.tolist()):
+                entry_dict[vertex_ids[i]]["source"] = vertex_ids[j] if j >= 0 else ""
+
+        return entry_dict
+
+    """
+    Prim's Algorithm - Minimum Spanning Tree
+
+    As in Graph.prim(), with (weight, source index, destination index) tuples in the heap. Returns two
+    arrays indexed by vertex index: the index of each vertex's parent in the tree (-1 for the roots
+    and for vertices outside the tree), and the weight of the edge to its parent (0 for the roots and
+    inf for vertices outside the tree). Returns None if 'start' is not in the graph.
+    """
+
+    def prim(self, start=None, forest=False):
+        num_vertices = len(self.vertex_ids)
+        indptr = self.indptr.tolist()
+        indices = self.indices.tolist()
+        weights = self.weights.tolist()
+
+        if start is None:
+            start = 0 if num_vertices > 0 else None
+        else:
+            start = self.get_index(start)
+        if start is None:
+            return None
+
+        parent = [-1] * num_vertices
+        parent_weights = [float('inf')] * num_vertices
+        in_tree = [False] * num_vertices
+
+        if forest:
+            roots = [start] + list(range(num_vertices))
+        else:
+            roots = [start]
+
+        edge_heap = BinaryHeap(BinaryHeap.MIN_HEAP, native=True)
+
+        for root in roots:
+            if in_tree[root]:
+                continue
+
+            # The root enters the tree through an edge with no source (-1)
+            in_tree[root] = True
+            parent_weights[root] = 0.0
+            edge_heap.add((0.0, -1, root))
+
+            while not edge_heap.is_empty():
+                weight, source, dest = edge_heap.pop()
+
+                if source >= 0:
+
+                    # An edge to a vertex which has been added to the tree since
+                    if in_tree[dest]:
+                        continue
+
+                    in_tree[dest] = True
+                    parent[dest] = source
+                    parent_weights[dest] = weight
+
+                for k in range(indptr[dest], indptr[dest + 1]):
+                    if not in_tree[indices[k]]:
+                        edge_heap.add((weights[k], dest, indices[k]))
+
+        return np.array(parent, dtype='int64'), np.array(parent_weights, dtype='float64')
+
+    def get_tree(self, parent, weights):
+        """ Converts the arrays returned by prim() into the symmetric graph returned by Graph.prim(). """
+
+        vertex_ids = self.vertex_ids
+        mst_graph = {}
+
+        for i, (j, weight) in enumerate(zip(parent.tolist(), weights.tolist())):
+            if weight == float('inf'):
+                continue
+
+            mst_graph.setdefault(vertex_ids[i], {})
+            if j >= 0:
+                mst_graph[vertex_ids[i]][vertex_ids[j]] = weight
+                mst_graph.setdefault(vertex_ids[j], {})[vertex_ids[i]] = weight
+
+        return mst_graph
+
+# Array of 'num_vertices' values, set from a dictionary of { index : value } and 'fill' elsewhere
+def to_array(values, num_vertices, fill, dtype):
+    array = np.full(num_vertices, fill, dtype=dtype)
+    if len(values) > 0:
+        array[np.fromiter(values.keys(), dtype='int64', count=len(values))] = np.fromiter(values.values(), dtype=dtype, count=len(values))
+    return array
+
+# The graph searched by a process of dijkstra_many()
+worker_graph = None
+
+def start_worker(graph):
+    global worker_graph
+    worker_graph = graph
+
+def dijkstra_worker(source):
+    distances, previous, nearest = worker_graph.search([source], None)
+    return source, distances, previous
\ No newline at end of file
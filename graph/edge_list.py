@@ -0,0 +1,109 @@
+""" Readers and writers of edge lists
+   Text edge lists have one edge per line: vertex_from, vertex_to and an optional weight (1 if
+   missing), separated by 'delimiter' (',' for CSV, '\t' for TSV, or None for any whitespace).
+   Blank lines and lines starting with '#' are skipped. Vertex ids are read as strings, which are
+   interned so that every occurrence of an id shares one string, or converted with 'vertex_type'
+   (eg. int).
+
+   Binary edge lists are a sequence of 24-byte records (native byte order):
+     vertex_from: int64, vertex_to: int64, weight: float64
+
+   Files are read a line or a chunk of records at a time, so an edge list is never held in memory
+   as a whole unless the caller collects it.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+EDGE_DTYPE = np.dtype([('vertex_from', 'int64'), ('vertex_to', 'int64'), ('weight', 'float64')])
+
+# Records read from a binary edge list at a time
+CHUNK_SIZE = 1 << 16
+
+def is_path(source):
+    if isinstance(source, (str, bytes, os.PathLike)):
+        return True
+    else:
+        return False
+
+def read_edges(source, delimiter=None, binary=False, vertex_type=None, weight_type=float, header=False):
+    """ Yields the edges of an edge list as (vertex_from, vertex_to, weight) tuples. 'source' is the
+    path of an edge list file, or an iterable of lines (such as an open file) or of edge tuples. """
+
+    if binary:
+        for records in read_edge_records(source):
+            yield from zip(records['vertex_from'].tolist(), records['vertex_to'].tolist(), records['weight'].tolist())
+
+    elif is_path(source):
+        with open(source, 'r') as file:
+            yield from parse_edges(file, delimiter, vertex_type, weight_type, header)
+
+    else:
+        yield from parse_edges(source, delimiter, vertex_type, weight_type, header)
+
+def parse_edges(lines, delimiter, vertex_type, weight_type, header):
+    convert = sys.intern if vertex_type is None else vertex_type
+    default_weight = weight_type(1)
+
+    for line in lines:
+
+        # Edges given as tuples are passed through
+        if not isinstance(line, str):
+            yield tuple(line)
+            continue
+
+        if line.strip() == "" or line.lstrip().startswith('#'):
+            continue
+
+        # The header is the first line which is neither blank nor a comment
+        if header:
+            header = False
+            continue
+
+        fields = line.split(delimiter)
+        if len(fields) < 2:
+            continue
+
+        vertex_from = convert(fields[0].strip())
+        vertex_to = convert(fields[1].strip())
+        if len(fields) > 2 and fields[2].strip() != "":
+            yield (vertex_from, vertex_to, weight_type(fields[2]))
+        else:
+            yield (vertex_from, vertex_to, default_weight)
+
+def read_edge_records(path, chunk_size=CHUNK_SIZE):
+    """ Yields the records of a binary edge list as structured arrays of up to 'chunk_size' records. """
+
+    with open(path, 'rb') as file:
+        while True:
+            records = np.fromfile(file, dtype=EDGE_DTYPE, count=chunk_size)
+            if records.size == 0:
+                break
+            yield records
+
+def load_edge_records(path):
+    """ Returns every record of a binary edge list in one structured array, mapped from the file rather than read. """
+
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=EDGE_DTYPE)
+    return np.memmap(path, dtype=EDGE_DTYPE, mode='r')
+
+def write_edges(path, edges, delimiter='\t', binary=False):
+    """ Writes (vertex_from, vertex_to, weight) edges as an edge list. Vertex ids of binary edge lists must be integers. """
+
+    if binary:
+        with open(path, 'wb') as file:
+            chunk = []
+            for edge in edges:
+                chunk.append(tuple(edge))
+                if len(chunk) == CHUNK_SIZE:
+                    np.array(chunk, dtype=EDGE_DTYPE).tofile(file)
+                    chunk = []
+            np.array(chunk, dtype=EDGE_DTYPE).tofile(file)
+
+    else:
+        with open(path, 'w') as file:
+            for vertex_from, vertex_to, weight in edges:
+                file.write(str(vertex_from) + delimiter + str(vertex_to) + delimiter + str(weight) + "\n")
\ No newline at end of file
@@ -1,6 +1,8 @@
+import math
 import sys
 from compares import ComparesInterface
 from heap import BinaryHeap
+from union_find import UnionFind
 
 # Entry in table for use in Dijkstra's Algorithm
 class DijkstraEntry(ComparesInterface):
@@ -26,6 +28,10 @@ class DijkstraEntry(ComparesInterface):
     def get_key(self):
         return self.key
 
+    # For use as the heap's key function, so distances are compared natively
+    def get_distance(self):
+        return self.entry["total_distance"]
+
 """
 Class implementation of a directed graph
 1. The graph object has a two-level dictionary structure of:
@@ -42,6 +48,9 @@ class Graph:
     def __init__(self):
         self.graph = {}
 
+        # Reverse adjacency for shortest_path(), made when first needed and dropped when edges change
+        self.reverse_graph = None
+
     def add_vertex(self, vertex_id):
         if vertex_id in self.graph.keys():
             return False
@@ -52,6 +61,7 @@ class Graph:
     def remove_vertex(self, vertex_id):
         if vertex_id in self.graph.keys():
             del self.graph[vertex_id]
+            self.reverse_graph = None
             return True
         else:
             return False
@@ -62,14 +72,61 @@ class Graph:
                 return False
             else:
                 self.graph[vertex_from][vertex_to] = weight
+                self.reverse_graph = None
                 return True
         else:
             return False
 
+    def add_edges(self, edges):
+        """ Adds (vertex_from, vertex_to, weight) edges, and any of their vertices not yet in the graph.
+        As with add_edge(), an edge which is already in the graph is left as it is. Returns the number of
+        edges added. """
+
+        graph = self.graph
+        num_added = 0
+        self.reverse_graph = None
+
+        for vertex_from, vertex_to, weight in edges:
+            adjacent = graph.get(vertex_from)
+            if adjacent is None:
+                adjacent = graph[vertex_from] = {}
+            if vertex_to not in graph:
+                graph[vertex_to] = {}
+
+            if vertex_to not in adjacent:
+                adjacent[vertex_to] = weight
+                num_added = num_added + 1
+
+        return num_added
+
+    @classmethod
+    def from_edge_list(cls, source, delimiter=None, binary=False, csr=False, vertex_type=None, weight_type=float, header=False):
+        """ Makes a graph of an edge list (see edge_list.py): the path of a text or binary edge list file,
+        or an iterable of lines or of edge tuples. If 'csr' is True, a CSRGraph is built directly,
+        without making the dictionary graph first. Either way, only the first of repeated edges is kept. """
+
+        # Imported here, so that the dictionary graph does not need NumPy
+        from edge_list import read_edges, load_edge_records
+
+        if csr:
+            from csr_graph import CSRGraph
+
+            # The records of a binary edge list are converted as arrays, never as Python objects
+            if binary:
+                records = load_edge_records(source)
+                return CSRGraph.from_edge_arrays(records['vertex_from'], records['vertex_to'], records['weight'])
+
+            return CSRGraph.from_edges(read_edges(source, delimiter, binary, vertex_type, weight_type, header))
+
+        graph = cls()
+        graph.add_edges(read_edges(source, delimiter, binary, vertex_type, weight_type, header))
+        return graph
+
     def remove_edge(self, vertex_from, vertex_to):
         if vertex_from in self.graph.keys():
             if vertex_to in self.graph[vertex_from].keys():
                 del self.graph[vertex_from][vertex_to]
+                self.reverse_graph = None
                 return True
             else:
                 return False
@@ -83,99 +140,380 @@ class Graph:
     """
     Prim's Algorithm - Minimum Spanning Tree
 
-    Notes: End of algorithm determination implementations
-      1. Determine whether the number of vertices in our MST are
-        the same as those in our original graph
-      2. Determine whether we can no longer find an unconnected vertex to add
-        to our MST
-    
+    The heap holds the edges leaving the tree, and the edge with the smallest weight is taken
+    first. An edge whose destination has been added to the tree since the edge was added to the
+    heap is skipped when it is popped (lazy deletion). This is O(E log E).
+
+    The tree is grown from 'start' (by default the first vertex in our original graph) and
+    spans the vertices reachable from it. If 'forest' is True, a new tree is grown from every
+    vertex not reached so far, giving a minimum spanning forest of a disconnected graph.
+
+    The output is in the form of a symmetric directed graph
+    """
+
+    def prim(self, start=None, forest=False):
+
+        # Store our minimum spanning tree
+        mst_graph = {}
+
+        if start is None and len(self.graph.keys()) > 0:
+            start = next(iter(self.graph.keys()))
+
+        if not (start in self.graph.keys()):
+            return mst_graph
+
+        if forest:
+            roots = [start] + list(self.graph.keys())
+        else:
+            roots = [start]
+
+        # Edges are (weight, source, dest) tuples, ordered by weight only
+        edge_heap = BinaryHeap(BinaryHeap.MIN_HEAP, key=lambda edge: edge[0])
+
+        for root in roots:
+            if root in mst_graph:
+                continue
+
+            mst_graph[root] = {}
+            self.add_tree_edges(edge_heap, root, mst_graph)
+
+            while not edge_heap.is_empty():
+                weight, source, dest = edge_heap.pop()
+
+                # An edge to a vertex which has been added to the tree since
+                if dest in mst_graph:
+                    continue
+
+                # Add the edge to our MST, and the reverse connection (as our output is a symmetric graph)
+                mst_graph[source][dest] = weight
+                mst_graph[dest] = {source : weight}
+
+                self.add_tree_edges(edge_heap, dest, mst_graph)
+
+        return mst_graph
+
+    # Add the edges from 'vertex' to the vertices not yet in the tree
+    def add_tree_edges(self, edge_heap, vertex, mst_graph):
+        for dest, weight in self.graph[vertex].items():
+
+            # Skip edges to vertices which have been removed
+            if dest in self.graph and not (dest in mst_graph):
+                edge_heap.add((weight, vertex, dest))
+
+
+    """
+    Kruskal's Algorithm - Minimum Spanning Tree
+
+    Edges are taken in order of weight, and an edge is added to the tree unless its vertices are
+    already connected by the edges added before it, which a union-find structure tells in almost
+    O(1). Sorting the edges makes this O(E log E); sparse graphs sort quickly, and edges which are
+    already sorted can be given as 'edges' (vertex_from, vertex_to, weight) to skip the sort.
+
+    Edges are treated as undirected. Every vertex of the graph appears in the output, so a
+    disconnected graph gives a minimum spanning forest.
+
     The output is in the form of a symmetric directed graph
     """
 
-    def prim(self):
-        
+    def kruskal(self, edges=None):
+
         # Store our minimum spanning tree
         mst_graph = {}
+        for i in self.graph.keys():
+            mst_graph[i] = {}
 
-        # Let's use the first vertex in our original graph as the starting point
-        first_key = list(self.graph.keys())[0]
-        mst_graph[first_key] = {}
+        if edges is None:
+            edges = [(i, j, weight) for i in self.graph.keys() for j, weight in self.graph[i].items()]
+            edges.sort(key=lambda edge: edge[2])
 
-        while len(mst_graph.keys()) < len(self.graph.keys()):
+        components = UnionFind(self.graph.keys())
 
-            # source = source vertex, dest = destination vertex
-            shortest_edge = {"value" : None, "source" : None, "dest" : None}
+        for vertex_from, vertex_to, weight in edges:
 
-            for vertex_from in mst_graph.keys():
-                for vertex_to in self.graph[vertex_from].keys():
-                    if not (vertex_to in mst_graph.keys()):
-                        current_edge_value = self.graph[vertex_from][vertex_to]
-                        if (shortest_edge["value"] == None) or (current_edge_value < shortest_edge["value"]):
-                            shortest_edge["value"] = current_edge_value
-                            shortest_edge["source"] = vertex_from
-                            shortest_edge["dest"] = vertex_to
+            # A spanning tree of every component has been found
+            if components.get_num_sets() == 1:
+                break
 
-            # Add the edge to our MST
-            mst_graph[shortest_edge["source"]][shortest_edge["dest"]] = shortest_edge["value"]
+            # union() fails for vertices which are already connected (or have been removed)
+            if components.union(vertex_from, vertex_to):
+                mst_graph[vertex_from][vertex_to] = weight
+                mst_graph[vertex_to][vertex_from] = weight
 
-            # Reverse connection of vertices (as our output is a symmetric graph)
-            # New 1st-level key must be added, since our 'vertex_to' vertex must be unconnected
-            mst_graph[shortest_edge["dest"]] = {shortest_edge["source"] : shortest_edge["value"]}
-                 
         return mst_graph
 
 
     """
     Dijkstra's Algorithm - Shortest path (from a vertex)
+
+    The heap holds an entry for every improvement of a vertex's total distance, and the entry
+    with the smallest distance is processed first (lazy deletion). Entries are never updated in
+    the heap; when a vertex's distance improves, a new entry is added instead, and the older
+    entries of a vertex which has already been processed are skipped when they are popped.
+    This is O((V + E) log V).
+
+    If a 'target' vertex is given, the algorithm stops as soon as the target's total distance is
+    final. Vertices which have not been processed by then keep their tentative entries.
     """
 
-    def dijkstra(self, vertex):
+    def dijkstra(self, vertex, target=None):
         entry_dict = {}
 
         if vertex in self.graph.keys():
 
-            vertex_heap = BinaryHeap(BinaryHeap.MIN_HEAP)
-
-            """
-            Add each vertex and their data (total distance, previous node) as an entry
-            to a table. Use both a heap and list -> Heap: For sorting the entries by total distance,
-            List: For accessing other entries.
-            """
+            # Table entry setup: every vertex starts out unreachable, except the starting vertex
             for i in self.graph.keys():
+                entry_dict[i] = { "previous" : "", "total_distance" : Graph.BIG_NUMBER }
+            entry_dict[vertex]["total_distance"] = 0
 
-                # Tabel entry setup
-                entry = { i : { "previous" : "", "total_distance" : Graph.BIG_NUMBER} }
-
-                if i == vertex:
-                    entry[i]["total_distance"] = 0
-
-                dijkstra_entry = DijkstraEntry(entry)
-                vertex_heap.add(dijkstra_entry)
-                entry_dict.update(entry)
+            vertex_heap = BinaryHeap(BinaryHeap.MIN_HEAP, key=DijkstraEntry.get_distance)
+            vertex_heap.add(DijkstraEntry({ vertex : { "previous" : "", "total_distance" : 0 } }))
+            processed = set()
 
-            """
-            The vertex with the smallest total distance will be processed first, then
-            removed from the table. This is repeated until there are no more vertices
-            in the table.
-            """
             while not vertex_heap.is_empty():
                 current_vertex = vertex_heap.pop().get_key()
 
-                for i in self.graph[current_vertex].keys():
+                # An older entry of a vertex that has already been processed
+                if current_vertex in processed:
+                    continue
+                processed.add(current_vertex)
 
-                    if entry_dict[i]["total_distance"] == Graph.BIG_NUMBER:
-                        entry_dict[i]["total_distance"] = entry_dict[current_vertex]["total_distance"] + self.graph[current_vertex][i]
-                        entry_dict[i]["previous"] = current_vertex
+                if current_vertex == target:
+                    break
+
+                current_distance = entry_dict[current_vertex]["total_distance"]
+
+                for i, weight in self.graph[current_vertex].items():
+
+                    # Skip edges to vertices which have been removed
+                    if i not in entry_dict:
+                        continue
 
-                    elif (entry_dict[current_vertex]["total_distance"] + self.graph[current_vertex][i] < entry_dict[i]["total_distance"]):
-                        entry_dict[i]["total_distance"] = entry_dict[current_vertex]["total_distance"] + self.graph[current_vertex][i]
+                    if current_distance + weight < entry_dict[i]["total_distance"]:
+                        entry_dict[i]["total_distance"] = current_distance + weight
                         entry_dict[i]["previous"] = current_vertex
 
-                    else:
-                        pass
+                        # Snapshot of the new distance, since the table entry may improve again
+                        vertex_heap.add(DijkstraEntry({ i : dict(entry_dict[i]) }))
 
         return entry_dict
 
+    """
+    Shortest path between two vertices
+
+    Returns the shortest path from 'source' to 'target' as (path, cost), where 'path' is the list of
+    vertices from 'source' to 'target', or None if there is no path. Only the vertices needed to
+    settle the path are explored, rather than the whole graph as in dijkstra().
+
+    Without a heuristic, this is a bidirectional Dijkstra's algorithm: one search runs forward from
+    'source' and one backward from 'target' (over the reversed edges), each step advancing the search
+    with the smaller distance at the top of its heap. 'best' is the shortest path found through a
+    vertex reached by both searches, and the searches stop once the two heap tops add up to at least
+    'best', since any path not yet seen must be at least that long.
+
+    With a heuristic, this is A*: heuristic(vertex, target) estimates the cost from a vertex to the
+    target, and vertices are taken in order of their distance plus that estimate. The path is
+    shortest if the estimate never exceeds the true cost and never drops by more than an edge's
+    weight along that edge (eg. euclidean_heuristic() for edges weighted by at least their length).
+    """
+
+    def shortest_path(self, source, target, heuristic=None):
+        if not (source in self.graph.keys()) or not (target in self.graph.keys()):
+            return None
+
+        if source == target:
+            return [source], 0
+
+        if heuristic is not None:
+            return self.a_star(source, target, heuristic)
+
+        if self.reverse_graph is None:
+            self.reverse_graph = self.get_reverse_graph()
+
+        # Each direction: adjacency, distances, previous vertex (towards its own start), processed vertices, heap
+        searches = []
+        for start, adjacency in [(source, self.graph), (target, self.reverse_graph)]:
+            vertex_heap = BinaryHeap(BinaryHeap.MIN_HEAP, key=lambda entry: entry[0])
+            vertex_heap.add((0, start))
+            searches.append((adjacency, { start : 0 }, { start : None }, set(), vertex_heap))
+
+        best = None
+        meeting_vertex = None
+
+        while not searches[0][4].is_empty() and not searches[1][4].is_empty():
+            forward_top = searches[0][4].get_priority(0)
+            backward_top = searches[1][4].get_priority(0)
+            if best is not None and forward_top + backward_top >= best:
+                break
+
+            # Advance the search whose next vertex is nearer its start
+            if forward_top <= backward_top:
+                adjacency, distances, previous, processed, vertex_heap = searches[0]
+                other_distances = searches[1][1]
+            else:
+                adjacency, distances, previous, processed, vertex_heap = searches[1]
+                other_distances = searches[0][1]
+
+            current_distance, current_vertex = vertex_heap.pop()
+
+            # An older entry of a vertex that has already been processed
+            if current_vertex in processed:
+                continue
+            processed.add(current_vertex)
+
+            for i, weight in adjacency.get(current_vertex, {}).items():
+
+                # Skip edges to vertices which have been removed
+                if not (i in self.graph):
+                    continue
+
+                distance = current_distance + weight
+                if not (i in distances) or distance < distances[i]:
+                    distances[i] = distance
+                    previous[i] = current_vertex
+                    vertex_heap.add((distance, i))
+
+                    if i in other_distances and (best is None or distance + other_distances[i] < best):
+                        best = distance + other_distances[i]
+                        meeting_vertex = i
+
+        if best is None:
+            return None
+
+        # Forward half from the source to the meeting vertex, then backward half on to the target
+        path = []
+        vertex = meeting_vertex
+        while vertex is not None:
+            path.append(vertex)
+            vertex = searches[0][2][vertex]
+        path.reverse()
+
+        vertex = searches[1][2][meeting_vertex]
+        while vertex is not None:
+            path.append(vertex)
+            vertex = searches[1][2][vertex]
+
+        return path, best
+
+    # A* search from 'source' to 'target' (see shortest_path())
+    def a_star(self, source, target, heuristic):
+        distances = { source : 0 }
+        previous = { source : None }
+        processed = set()
+
+        vertex_heap = BinaryHeap(BinaryHeap.MIN_HEAP, key=lambda entry: entry[0])
+        vertex_heap.add((heuristic(source, target), 0, source))
+
+        while not vertex_heap.is_empty():
+            estimate, current_distance, current_vertex = vertex_heap.pop()
+
+            # An older entry of a vertex that has already been processed
+            if current_vertex in processed:
+                continue
+            processed.add(current_vertex)
+
+            if current_vertex == target:
+                path = []
+                vertex = target
+                while vertex is not None:
+                    path.append(vertex)
+                    vertex = previous[vertex]
+                path.reverse()
+
+                return path, current_distance
+
+            for i, weight in self.graph[current_vertex].items():
+
+                # Skip edges to vertices which have been removed
+                if not (i in self.graph):
+                    continue
+
+                distance = current_distance + weight
+                if not (i in distances) or distance < distances[i]:
+                    distances[i] = distance
+                    previous[i] = current_vertex
+                    vertex_heap.add((distance + heuristic(i, target), distance, i))
+
+        return None
+
+    # Return the graph with every edge reversed: { vertex_to : { vertex_from : weight } }
+    def get_reverse_graph(self):
+        reverse_graph = {}
+
+        for i in self.graph.keys():
+            for j, weight in self.graph[i].items():
+                if not (j in reverse_graph):
+                    reverse_graph[j] = {}
+                reverse_graph[j][i] = weight
+
+        return reverse_graph
+
+    @staticmethod
+    def euclidean_heuristic(coordinates):
+        """ Returns a heuristic for shortest_path() giving the straight-line distance between vertices,
+        where 'coordinates' maps every vertex to a tuple of its coordinates. """
+
+        def heuristic(vertex, target):
+            return math.dist(coordinates[vertex], coordinates[target])
+
+        return heuristic
+
+    """
+    Dijkstra's Algorithm from many sources (see CSRGraph.dijkstra_many())
+
+    Yields (source, entry_dict) for every source, where 'entry_dict' is the table dijkstra() returns,
+    as the searches finish in a pool of 'workers' processes.
+    """
+
+    def dijkstra_many(self, sources, workers=None):
+        csr_graph = self.to_csr()
+
+        for source, distances, previous in csr_graph.dijkstra_many(sources, workers):
+            if distances is None:
+                yield source, {}
+            else:
+                yield source, csr_graph.get_entry_dict(distances, previous)
+
+    """
+    Multi-source Dijkstra's Algorithm - Nearest source (see CSRGraph.multi_source_dijkstra())
+
+    Returns a table like dijkstra()'s, in which each vertex's entry also holds its nearest "source"
+    ("" if no source can reach it), and the "total_distance" and "previous" vertex are of the path
+    from that source. Returns an empty table if any source is not in the graph.
+    """
+
+    def multi_source_dijkstra(self, sources):
+        csr_graph = self.to_csr()
+
+        result = csr_graph.multi_source_dijkstra(sources)
+        if result is None:
+            return {}
+
+        return csr_graph.get_entry_dict(*result)
+
+    # Return a frozen compressed sparse row (CSR) copy of the graph (see csr_graph.py)
+    def to_csr(self):
+
+        # Imported here, so that the dictionary graph does not need NumPy
+        from csr_graph import CSRGraph
+        return CSRGraph.from_graph(self)
+
+    # Write the graph to a binary snapshot file (see snapshot.py)
+    def save(self, path):
+        from snapshot import save_snapshot
+        save_snapshot(self.to_csr(), path)
+
+    @classmethod
+    def load(cls, path, csr=False, mmap=True):
+        """ Reads a graph from a binary snapshot file. If 'csr' is True, the CSRGraph is returned as it is
+        loaded, with its arrays mapped from the file (unless 'mmap' is False), instead of a Graph. """
+
+        from snapshot import load_snapshot
+        csr_graph = load_snapshot(path, mmap)
+
+        if csr:
+            return csr_graph
+        return csr_graph.to_graph()
+
     # Return a string of vertices and their edges
     def get_string(self):
 
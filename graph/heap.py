@@ -7,23 +7,61 @@
      -1: Object calling the method is less than the one used as an argument
 
    Ex) object1.compare(object2)
+
+   Alternatively, the heap can order its elements without compare():
+     native=True: elements are compared directly with the '<' / '>' operators
+     key=function: key(element) is computed once when the element is inserted, cached
+       alongside the element, and the cached keys are compared with '<' / '>'
+
+   In every mode, the min/max decision is made once at construction.
 """
 
+import operator
+
+def priority_function(heap_type, native):
+    """ Returns a function higher(x, y) which is True when x must be placed above y in a heap
+    of type 'heap_type'. If 'native' is False, x and y are compared with their compare() method. """
+
+    if native:
+        if heap_type == BinaryHeap.MAX_HEAP:
+            return operator.gt
+        else:
+            return operator.lt
+    else:
+        if heap_type == BinaryHeap.MAX_HEAP:
+            return lambda x, y: x.compare(y) == 1
+        else:
+            return lambda x, y: x.compare(y) == -1
+
 class BinaryHeap:
 
     MIN_HEAP = 0
     MAX_HEAP = 1
 
-    def __init__(self, heap_type):
+    def __init__(self, heap_type, key=None, native=False):
         self.array = []
         self.heap_type = heap_type
 
+        # Cached keys, parallel to 'array' (None if no key function is used)
+        self.key = key
+        self.keys = None if key is None else []
+
+        # higher(x, y) is True if priority x belongs above priority y
+        self.higher = priority_function(heap_type, native or key is not None)
+
     def get_size(self):
         return len(self.array)
 
     def get_array(self):
         return self.array
 
+    # The value used for ordering the element at 'index' (its cached key, or the element itself)
+    def get_priority(self, index):
+        if self.keys is None:
+            return self.array[index]
+        else:
+            return self.keys[index]
+
     # Determines the existence of a left child
     def left_child_exist(self, index):
         if (self.left_child(index) > len(self.array) - 1):
@@ -38,6 +76,7 @@ class BinaryHeap:
         else:
             return True
 
+    # Determines index of parent index - valid index is determined in calling code
     def parent(self, index):
         return (index - 1) // 2
 
@@ -70,90 +109,69 @@ class BinaryHeap:
             return
 
         self.array = array
-        index = len(self.array) - 1
-
-        while(index >= 0):
-            self.sift_down(index)
-            index = index - 1
+        if self.keys is not None:
+            self.keys = [self.key(value) for value in array]
+        self.heapify()
 
     def add(self, value):
         index = len(self.array)
         self.array.append(value)
+        if self.keys is not None:
+            self.keys.append(self.key(value))
         self.sift_up(index)
 
     def pop(self):
         value = None
         if len(self.array) > 0:
             value = self.array[0]
-            if len(self.array) > 1:
-                self.array[0] = self.array.pop()
+            last = self.array.pop()
+            if self.keys is not None:
+                last_key = self.keys.pop()
+            if len(self.array) > 0:
+                self.array[0] = last
+                if self.keys is not None:
+                    self.keys[0] = last_key
                 self.sift_down(0)
-            else:
-                self.array.pop()
         return value
 
     def swap_elements(self, x, y):
-        temp = self.array[x]
-        self.array[x] = self.array[y]
-        self.array[y] = temp
+        array = self.array
+        array[x], array[y] = array[y], array[x]
+        if self.keys is not None:
+            keys = self.keys
+            keys[x], keys[y] = keys[y], keys[x]
 
     def sift_up(self, index):
-        complete = False
-
-        while (index > 0 and complete == False):
-            parent_index = self.parent(index)
-            if(self.heap_type == BinaryHeap.MAX_HEAP):
-                if(self.array[index].compare(self.array[parent_index]) == 1):
-                    self.swap_elements(index, parent_index)
-                    index = parent_index
-                else:
-                    complete = True
-            elif(self.heap_type == BinaryHeap.MIN_HEAP):
-                if(self.array[index].compare(self.array[parent_index]) == -1):
-                    self.swap_elements(index, parent_index)
-                    index = parent_index
-                else:
-                    complete = True
+        higher = self.higher
+        priorities = self.array if self.keys is None else self.keys
+
+        while index > 0:
+            parent_index = (index - 1) // 2
+            if higher(priorities[index], priorities[parent_index]):
+                self.swap_elements(index, parent_index)
+                index = parent_index
+            else:
+                break
 
     def sift_down(self, index):
-        complete = False
-        z_index = -1
-        while(index < len(self.array) and complete == False):
-
-            # existence of children
-            if(self.left_child_exist(index)):
-                if(self.right_child_exist(index)):
-                
-                    # determine smaller/bigger value by heap type
-                    if(self.heap_type == BinaryHeap.MAX_HEAP):
-                        if(self.array[self.left_child(index)].compare( self.array[self.right_child(index)]) == 1):
-                            z_index = self.left_child(index)
-                        else:
-                            z_index = self.right_child(index)
-                    elif(self.heap_type == BinaryHeap.MIN_HEAP):
-                        if(self.array[self.left_child(index)].compare(self.array[self.right_child(index)]) == -1):
-                            z_index = self.left_child(index)
-                        else:
-                            z_index = self.right_child(index)
-
-                # only left child exist, use this value to compare with parent
-                else:
-                    z_index = self.left_child(index)
-
-                # Swap if necessary, depending on heap type
-                if(self.heap_type == BinaryHeap.MAX_HEAP):
-                    if(self.array[z_index].compare(self.array[index]) == 1):
-                        self.swap_elements(z_index, index)
-                        index = z_index
-                    else:
-                        complete = True
-                if(self.heap_type == BinaryHeap.MIN_HEAP):
-                    if(self.array[z_index].compare(self.array[index]) == -1):
-                        self.swap_elements(z_index, index)
-                        index = z_index
-                    else:
-                        complete = True
+        higher = self.higher
+        priorities = self.array if self.keys is None else self.keys
+        length = len(priorities)
+
+        while True:
+            z_index = 2 * index + 1
 
             # No child exists, therefore exit loop
+            if z_index >= length:
+                break
+
+            # If the right child exists, use whichever child has the higher priority
+            if z_index + 1 < length and not higher(priorities[z_index], priorities[z_index + 1]):
+                z_index = z_index + 1
+
+            # Swap if the child belongs above its parent
+            if higher(priorities[z_index], priorities[index]):
+                self.swap_elements(z_index, index)
+                index = z_index
             else:
-                complete = True
\ No newline at end of file
+                break
\ No newline at end of file
@@ -0,0 +1,122 @@
+""" Binary snapshots of graphs
+   A snapshot holds a CSRGraph (csr_graph.py) in a form which load_snapshot() maps into memory with
+   numpy.memmap instead of reading and parsing it: the CSR arrays of a loaded graph are views of the
+   file, and their pages are read by the operating system as they are first used. Only the vertex id
+   table is converted into Python objects when a snapshot is loaded.
+
+   File layout (native byte order, every section starting on an 8-byte boundary):
+     header: int64[8] = magic, version, num_vertices, num_edges, id kind, id bytes, unused, unused
+     vertex ids: id kind 0: int64[num_vertices]
+                 id kind 1: offsets int64[num_vertices + 1], then the UTF-8 encoded ids (id bytes long)
+     indptr: int64[num_vertices + 1]
+     indices: int64[num_edges]
+     weights: float64[num_edges]
+"""
+
+import os
+
+import numpy as np
+
+from csr_graph import CSRGraph
+
+MAGIC = int(np.frombuffer(b'GRAPHCSR', dtype='int64')[0])
+VERSION = 1
+HEADER_SIZE = 8
+
+INT_IDS = 0
+STRING_IDS = 1
+
+# Number of bytes needed to pad 'size' bytes to a multiple of 8
+def padding(size):
+    return -size % 8
+
+def save_snapshot(csr, path):
+    """ Writes a CSRGraph to 'path'. Vertex ids must be all integers or all strings. """
+
+    vertex_ids = csr.vertex_ids
+
+    if all(type(vertex) is int for vertex in vertex_ids):
+        id_kind = INT_IDS
+        id_table = [np.array(vertex_ids, dtype='int64').tobytes()]
+        id_bytes = 0
+
+    elif all(isinstance(vertex, str) for vertex in vertex_ids):
+        id_kind = STRING_IDS
+        encoded = [vertex.encode('utf-8') for vertex in vertex_ids]
+        offsets = np.zeros(len(encoded) + 1, dtype='int64')
+        np.cumsum([len(vertex) for vertex in encoded], out=offsets[1:])
+        id_bytes = int(offsets[-1])
+        id_table = [offsets.tobytes(), b''.join(encoded), bytes(padding(id_bytes))]
+
+    else:
+        raise ValueError("snapshot vertex ids must be all integers or all strings")
+
+    header = np.array([MAGIC, VERSION, csr.get_num_vertices(), csr.get_num_edges(), id_kind, id_bytes, 0, 0], dtype='int64')
+
+    with open(path, 'wb') as file:
+        file.write(header.tobytes())
+        for section in id_table:
+            file.write(section)
+        csr.indptr.astype('int64', copy=False).tofile(file)
+        csr.indices.astype('int64', copy=False).tofile(file)
+        csr.weights.astype('float64', copy=False).tofile(file)
+
+def load_snapshot(path, mmap=True):
+    """ Returns the CSRGraph in the snapshot at 'path'. If 'mmap' is False, the file is read into memory instead of mapped. """
+
+    if os.path.getsize(path) < HEADER_SIZE * 8:
+        raise ValueError("%s is not a version %d graph snapshot" % (path, VERSION))
+
+    if mmap:
+        data = np.memmap(path, dtype='uint8', mode='r')
+    else:
+        data = np.fromfile(path, dtype='uint8')
+
+    header = data[:HEADER_SIZE * 8].view('int64')
+    if int(header[0]) != MAGIC or int(header[1]) != VERSION:
+        raise ValueError("%s is not a version %d graph snapshot" % (path, VERSION))
+
+    num_vertices = int(header[2])
+    num_edges = int(header[3])
+    id_kind = int(header[4])
+    id_bytes = int(header[5])
+
+    if id_kind == INT_IDS:
+        id_table_size = num_vertices * 8
+    elif id_kind == STRING_IDS:
+        id_table_size = (num_vertices + 1) * 8 + id_bytes + padding(id_bytes)
+    else:
+        raise ValueError("%s has an unknown vertex id kind %d" % (path, id_kind))
+
+    # The sections must fill the file exactly, or the arrays taken from it would be short (or wrong)
+    if min(num_vertices, num_edges, id_bytes) < 0:
+        raise ValueError("%s has negative counts in its header" % path)
+    expected_size = HEADER_SIZE * 8 + id_table_size + (num_vertices + 1) * 8 + num_edges * 16
+    if data.size != expected_size:
+        raise ValueError("%s is %d bytes, but its header describes %d bytes (the file is truncated or corrupt)"
+                         % (path, data.size, expected_size))
+
+    # Each call takes the next section of 'count' items of 'dtype' from the file
+    offset = HEADER_SIZE * 8
+    def section(dtype, count):
+        nonlocal offset
+        size = count * np.dtype(dtype).itemsize
+        array = data[offset:offset + size].view(dtype)
+        offset = offset + size + padding(size)
+        return array
+
+    if id_kind == INT_IDS:
+        vertex_ids = section('int64', num_vertices).tolist()
+    else:
+        offsets = section('int64', num_vertices + 1).tolist()
+        encoded = section('uint8', id_bytes).tobytes()
+        vertex_ids = [encoded[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(num_vertices)]
+
+    indptr = section('int64', num_vertices + 1)
+    indices = section('int64', num_edges)
+    weights = section('float64', num_edges)
+
+    if int(indptr[0]) != 0 or int(indptr[-1]) != num_edges:
+        raise ValueError("%s has an edge table which does not match its header" % path)
+
+    return CSRGraph(vertex_ids, indptr, indices, weights)
\ No newline at end of file
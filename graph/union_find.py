@@ -0,0 +1,101 @@
+""" Implementation of a union-find (disjoint set) structure
+   Every set is a tree of elements, represented by the element at its root. find() compresses the
+   path it follows, pointing every element on it at the root, and union() attaches the root of the
+   tree of lower rank (an upper bound on its height) to the other root. Together, these keep a
+   sequence of operations almost O(1) amortized per operation.
+
+   Elements can be added at any time, so the structure can track connectivity incrementally as
+   edges are added to a graph.
+"""
+
+class UnionFind:
+
+    def __init__(self, elements=None):
+        self.parent = {}
+        self.rank = {}
+        self.size = {}
+        self.num_sets = 0
+
+        if elements is not None:
+            for element in elements:
+                self.add(element)
+
+    # Number of disjoint sets
+    def get_num_sets(self):
+        return self.num_sets
+
+    # Number of elements
+    def get_length(self):
+        return len(self.parent)
+
+    def contains(self, element):
+        if element in self.parent:
+            return True
+        else:
+            return False
+
+    def add(self, element):
+        """ Adds 'element' in a set of its own. Returns False if the element was already added. """
+
+        if element in self.parent:
+            return False
+
+        self.parent[element] = element
+        self.rank[element] = 0
+        self.size[element] = 1
+        self.num_sets = self.num_sets + 1
+
+        return True
+
+    def find(self, element):
+        """ Returns the element representing the set of 'element', or None if the element was not added. """
+
+        if element not in self.parent:
+            return None
+
+        parent = self.parent
+        root = element
+        while parent[root] != root:
+            root = parent[root]
+
+        # Path compression: point every element on the path at the root
+        while parent[element] != root:
+            parent[element], element = root, parent[element]
+
+        return root
+
+    def union(self, x, y):
+        """ Merges the sets of 'x' and 'y'. Returns False if they were already in the same set, or either was not added. """
+
+        x_root = self.find(x)
+        y_root = self.find(y)
+
+        if x_root is None or y_root is None or x_root == y_root:
+            return False
+
+        # Union by rank: the shallower tree goes under the root of the deeper one
+        if self.rank[x_root] < self.rank[y_root]:
+            x_root, y_root = y_root, x_root
+
+        self.parent[y_root] = x_root
+        self.size[x_root] = self.size[x_root] + self.size[y_root]
+        if self.rank[x_root] == self.rank[y_root]:
+            self.rank[x_root] = self.rank[x_root] + 1
+
+        self.num_sets = self.num_sets - 1
+
+        return True
+
+    def connected(self, x, y):
+        root = self.find(x)
+        if root is not None and root == self.find(y):
+            return True
+        else:
+            return False
+
+    # Number of elements in the set of 'element'
+    def get_set_size(self, element):
+        root = self.find(element)
+        if root is None:
+            return 0
+        return self.size[root]
\ No newline at end of file